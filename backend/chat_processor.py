@@ -1,17 +1,30 @@
 import re
+import json
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional
-import aioredis
 import os
 
-from weaviate_manager import WeaviateManager
+from storage_backend import StorageBackend
+from redis_manager import RedisManager
+from write_queue import WriteQueue
+from reranker import Reranker
+from tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Bumped on every mutation so cached search results from before the write are ignored
+CACHE_VERSION_KEY = "search:version"
+
 class ChatProcessor:
-    def __init__(self, weaviate_manager: WeaviateManager):
+    def __init__(self, weaviate_manager: StorageBackend, redis_manager: Optional[RedisManager] = None,
+                 write_queue: Optional[WriteQueue] = None, reranker: Optional[Reranker] = None):
         self.weaviate = weaviate_manager
-        self.redis = None
+        self.redis = redis_manager or RedisManager()
+        self.write_queue = write_queue
+        self.reranker = reranker or Reranker()
+        self.search_results = int(os.getenv("SEARCH_RESULTS", "3"))
+        self.cache_ttl = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
         
         # Command patterns
         self.commands = {
@@ -26,41 +39,64 @@ class ChatProcessor:
     
     async def initialize(self):
         """Initialize chat processor"""
-        try:
-            self.redis = aioredis.from_url(
-                os.getenv("REDIS_URL", "redis://redis:6379"),
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=10
-            )
-            await self.redis.ping()
-            logger.info("Chat processor initialized")
-        except Exception as e:
-            logger.warning(f"Redis not available: {e}")
-            self.redis = None
+        if self.redis.client is None:
+            await self.redis.initialize()
+        if self.write_queue:
+            self.write_queue.add_listener(self.invalidate_search_cache)
+            self.write_queue.set_resolver(self._find_target)
+        logger.info("Chat processor initialized")
+    
+    async def invalidate_search_cache(self):
+        """Make previously cached search results stale"""
+        await self.redis.incr(CACHE_VERSION_KEY)
     
     async def process_message(self, message: str, session_id: str = "default") -> Dict[str, Any]:
         """Process incoming message - either command or search query"""
         message = message.strip()
         
         # Check if it's a command
-        command_result = await self.process_command(message)
+        with span("command"):
+            command_result = await self.process_command(message)
         if command_result:
+            if command_result.get("data_modified"):
+                await self.invalidate_search_cache()
             return command_result
         
         # Otherwise, treat as search query
         return await self.process_search(message, session_id)
     
+    def is_mutation(self, message: str) -> bool:
+        """True if the message is a command that writes to the knowledge base or cache"""
+        message = message.strip()
+        return any(
+            re.match(self.commands[name], message, re.IGNORECASE)
+            for name in ('add', 'delete', 'update', 'clear')
+        )
+    
     async def process_command(self, message: str) -> Optional[Dict[str, Any]]:
         """Process database management commands"""
         message_lower = message.lower()
         
+        # Snapshot-only nodes can't keep changes; say so rather than pretend
+        if self.weaviate.read_only and any(
+            re.match(self.commands[name], message, re.IGNORECASE) for name in ('add', 'delete', 'update')
+        ):
+            return {
+                "response": "🔒 This node serves a read-only copy of the HDMI City Dwellers knowledge base; add, update and delete aren't available here.",
+                "action": "read_only",
+                "data_modified": False
+            }
+        
         # Add command: add: title | content | category
         if match := re.match(self.commands['add'], message, re.IGNORECASE):
             title = match.group(1).strip()
             content = match.group(2).strip()
             category = match.group(3).strip() if match.group(3) else "general"
             
+            if self._write_behind:
+                operation_id = await self.write_queue.submit("add", title=title, content=content, category=category)
+                return self._queued_result("add", f"'{title}' queued for addition to category '{category}'", operation_id)
+            
             success = await self.weaviate.add_knowledge(title, content, category)
             
             if success:
@@ -80,19 +116,23 @@ class ChatProcessor:
         elif match := re.match(self.commands['delete'], message, re.IGNORECASE):
             search_term = match.group(1).strip()
             
-            # First, search for items to delete
-            items = await self.weaviate.search(search_term, limit=5)
+            if self._write_behind:
+                # The queue worker looks up the target, so this returns without a search
+                operation_id = await self.write_queue.submit("delete", query=search_term)
+                return self._queued_result("delete", f"Best match for '{search_term}' queued for deletion", operation_id)
             
-            if not items:
+            # First, find the item to delete (most relevant match)
+            item = await self._find_target(search_term)
+            
+            if item is None:
                 return {
                     "response": f"❌ No items found matching '{search_term}' to delete.",
                     "action": "delete_not_found",
                     "data_modified": False
                 }
             
-            # Delete the first match (most relevant)
-            item_id = items[0]['_additional']['id']
-            item_title = items[0]['title']
+            item_id = item['_additional']['id']
+            item_title = item['title']
             
             success = await self.weaviate.delete_knowledge(item_id)
             
@@ -114,18 +154,22 @@ class ChatProcessor:
             search_term = match.group(1).strip()
             new_content = match.group(2).strip()
             
+            if self._write_behind:
+                operation_id = await self.write_queue.submit("update", query=search_term, content=new_content)
+                return self._queued_result("update", f"Best match for '{search_term}' queued for update", operation_id)
+            
             # Search for item to update
-            items = await self.weaviate.search(search_term, limit=1)
+            item = await self._find_target(search_term)
             
-            if not items:
+            if item is None:
                 return {
                     "response": f"❌ No items found matching '{search_term}' to update.",
                     "action": "update_not_found",
                     "data_modified": False
                 }
             
-            item_id = items[0]['_additional']['id']
-            item_title = items[0]['title']
+            item_id = item['_additional']['id']
+            item_title = item['title']
             
             success = await self.weaviate.update_knowledge(item_id, content=new_content)
             
@@ -232,20 +276,20 @@ Use 'list all' to see all entries or 'list category_name' to filter by category.
         
         # Clear command (clear cache)
         elif match := re.match(self.commands['clear'], message, re.IGNORECASE):
-            if self.redis:
-                try:
-                    await self.redis.flushdb()
+            if self.redis.available:
+                # Bump the cache version rather than FLUSHDB, which would also
+                # wipe rate limit buckets
+                if await self.redis.incr(CACHE_VERSION_KEY) is not None:
                     return {
                         "response": "🧹 Cache cleared successfully.",
                         "action": "clear_cache",
                         "data_modified": False
                     }
-                except Exception as e:
-                    return {
-                        "response": f"❌ Failed to clear cache: {e}",
-                        "action": "clear_cache_failed",
-                        "data_modified": False
-                    }
+                return {
+                    "response": "❌ Failed to clear cache.",
+                    "action": "clear_cache_failed",
+                    "data_modified": False
+                }
             else:
                 return {
                     "response": "ℹ️ No cache to clear (Redis not available).",
@@ -257,51 +301,96 @@ Use 'list all' to see all entries or 'list category_name' to filter by category.
     
     async def process_search(self, query: str, session_id: str) -> Dict[str, Any]:
         """Process search query"""
-        # Check cache first
-        cache_key = f"search:{hash(query.lower())}"
-        cached_result = None
+        # Cached result and cache version in one round-trip
+        cache_key = self._cache_key(query)
+        cached_result, cache_version = await self.redis.pipeline([
+            ("get", (cache_key,)),
+            ("get", (CACHE_VERSION_KEY,))
+        ]) or [None, None]
+        cache_version = cache_version or "0"
         
-        if self.redis:
+        if cached_result:
             try:
-                cached_result = await self.redis.get(cache_key)
-            except:
-                pass
+                cached = json.loads(cached_result)
+            except ValueError:
+                cached = {}
+            if cached.get("version") == cache_version:
+                return {
+                    "response": cached["response"],
+                    "action": "search_cached",
+                    "data_modified": False
+                }
         
-        if cached_result:
+        # Search Weaviate
+        items = await self._ranked_search(query, self.search_results)
+        
+        if not items and not self.weaviate.available:
+            # Fail fast while Weaviate is unhealthy; don't cache the miss
             return {
-                "response": cached_result,
-                "action": "search_cached",
+                "response": "⚠️ The HDMI City Dwellers knowledge base is temporarily unavailable. Please try again in a moment.",
+                "action": "search_unavailable",
                 "data_modified": False
             }
         
-        # Search Weaviate
-        items = await self.weaviate.search(query, limit=3)
-        
-        if not items:
-            response = f"🔍 I couldn't find any information about '{query}' in the HDMI City Dwellers knowledge base.\n\nTry:\n• Using different keywords\n• Adding information with: `add: title | content | category`\n• Type 'help' for more commands"
-        else:
-            response_parts = [f"🔍 **Found {len(items)} result(s) for '{query}' in HDMI City Dwellers:**\n"]
-            
-            for i, item in enumerate(items, 1):
-                title = item.get('title', 'Untitled')
-                content = item.get('content', 'No content')
-                category = item.get('category', 'general')
-                certainty = item.get('_additional', {}).get('certainty', 0)
-                
-                response_parts.append(f"**{i}. {title}** ({category}) - {certainty:.2f} match")
-                response_parts.append(f"{content}\n")
-            
-            response = "\n".join(response_parts)
+        with span("format"):
+            response = self._format_results(query, items)
         
         # Cache result
-        if self.redis:
-            try:
-                await self.redis.setex(cache_key, 3600, response)  # 1 hour cache
-            except:
-                pass
+        await self.redis.pipeline([
+            ("setex", (cache_key, self.cache_ttl, json.dumps({"version": cache_version, "response": response})))
+        ])
         
         return {
             "response": response,
             "action": "search",
             "data_modified": False
         }
+    
+    def _format_results(self, query: str, items: List[Dict[str, Any]]) -> str:
+        """Render search hits as a chat response"""
+        if not items:
+            return f"🔍 I couldn't find any information about '{query}' in the HDMI City Dwellers knowledge base.\n\nTry:\n• Using different keywords\n• Adding information with: `add: title | content | category`\n• Type 'help' for more commands"
+        
+        response_parts = [f"🔍 **Found {len(items)} result(s) for '{query}' in HDMI City Dwellers:**\n"]
+        
+        for i, item in enumerate(items, 1):
+            title = item.get('title', 'Untitled')
+            content = item.get('content', 'No content')
+            category = item.get('category', 'general')
+            certainty = item.get('_additional', {}).get('certainty', 0)
+            
+            response_parts.append(f"**{i}. {title}** ({category}) - {certainty:.2f} match")
+            response_parts.append(f"{content}\n")
+        
+        return "\n".join(response_parts)
+    
+    async def _ranked_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Search, over-fetching and reranking when the reranker is enabled"""
+        if not self.reranker.enabled:
+            return await self.weaviate.search(query, limit=limit)
+        
+        candidates = await self.weaviate.search(query, limit=max(self.reranker.candidates, limit))
+        with span("rerank", candidates=len(candidates)):
+            return self.reranker.rerank(query, candidates, top_k=limit)
+    
+    async def _find_target(self, search_term: str) -> Optional[Dict[str, Any]]:
+        """The entry a delete or update command acts on: the top search result for the term"""
+        items = await self._ranked_search(search_term, 1)
+        return items[0] if items else None
+    
+    @property
+    def _write_behind(self) -> bool:
+        return self.write_queue is not None and self.write_queue.enabled
+    
+    def _queued_result(self, action: str, description: str, operation_id: str) -> Dict[str, Any]:
+        return {
+            "response": f"⏳ {description}. Operation ID: `{operation_id}`",
+            "action": f"{action}_queued",
+            "data_modified": False,
+            "operation_id": operation_id
+        }
+    
+    def _cache_key(self, query: str) -> str:
+        """Stable cache key for a search query (``hash()`` is randomized per process)"""
+        digest = hashlib.sha1(query.lower().encode("utf-8")).hexdigest()
+        return f"search:{digest}"
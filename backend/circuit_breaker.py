@@ -0,0 +1,88 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+class CircuitBreaker:
+    """Track failures of a remote dependency and fail fast while it is unhealthy.
+
+    The breaker is closed while calls succeed. After ``failure_threshold``
+    consecutive failures (calls slower than ``slow_call_threshold`` count as
+    failures) it opens and rejects calls for ``recovery_timeout`` seconds, then
+    lets a single probe through (half-open) to decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 slow_call_threshold: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        elif (self._state == self.HALF_OPEN and self._probe_in_flight
+              and time.monotonic() - self._probe_started >= self.recovery_timeout):
+            # The probe never reported back; let another one through
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+        return False
+
+    def release_probe(self):
+        """Give up a half-open probe without a verdict, e.g. when it was cancelled"""
+        self._probe_in_flight = False
+
+    def record_success(self, duration: Optional[float] = None):
+        """Record a completed call, treating slow calls as failures"""
+        if self.slow_call_threshold is not None and duration is not None and duration > self.slow_call_threshold:
+            self.record_failure()
+            return
+
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.failures = 0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call and open the circuit if the threshold is reached"""
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self.failures} failure(s)")
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        """Return the breaker state for health reporting"""
+        return {
+            "state": self.state,
+            "failures": self.failures
+        }
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from storage_backend import StorageBackend
+from reranker import tokenize
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ["title", "content", "category", "created_at", "updated_at", "tags"]
+
+class _IndexState:
+    """One loaded snapshot plus its keyword index.
+
+    ``load`` builds a new state off the event loop and swaps it in with a
+    single assignment, so readers never see a half-built index.
+    """
+
+    def __init__(self, objects: List[Dict[str, Any]], vectors: np.ndarray, snapshot_at: Optional[float]):
+        self.objects = objects
+        self.vectors = vectors
+        self.norms = np.linalg.norm(vectors, axis=1) if len(vectors) else np.zeros(0, dtype=np.float32)
+        self.postings = defaultdict(dict)
+        self.doc_lengths: List[int] = []
+        self.snapshot_at = snapshot_at
+        for row, obj in enumerate(objects):
+            self.index(row, obj)
+
+    def index(self, row: int, obj: Dict[str, Any]):
+        terms = Counter(tokenize(f"{obj.get('title') or ''} {obj.get('content') or ''}"))
+        for term, count in terms.items():
+            self.postings[term][row] = count
+        self.doc_lengths.append(sum(terms.values()))
+
+    def result(self, row: int, additional: Dict[str, Any]) -> Dict[str, Any]:
+        obj = self.objects[row]
+        item = {field: obj.get(field) for field in FIELDS}
+        item["_additional"] = {"id": obj["id"], **additional}
+        return item
+
+    def live_rows(self, category: Optional[str] = None) -> List[int]:
+        return [
+            row for row, obj in enumerate(self.objects)
+            if category is None or obj.get("category") == category
+        ]
+
+    def bm25(self, terms: List[str]) -> Dict[int, float]:
+        live = len(self.objects)
+        average_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0
+        scores = defaultdict(float)
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row, tf in postings.items():
+                length_norm = 1.2 * (0.25 + 0.75 * self.doc_lengths[row] / (average_length or 1))
+                scores[row] += idf * tf * 2.2 / (tf + length_norm)
+        return scores
+
+class LocalIndex(StorageBackend):
+    """Embedded knowledge base index for offline and edge nodes.
+
+    A snapshot is a directory holding ``objects.json`` and ``vectors.npy`` (one
+    float32 row per object, exported from Weaviate). The matrix is memory-mapped
+    rather than loaded, and an in-memory inverted index over title and content
+    is rebuilt on load.
+
+    Queries cannot be embedded offline, so search ranks by BM25 over the
+    keyword index, then re-scores every object by cosine similarity to the
+    centroid of the best keyword hits' vectors. This surfaces semantically
+    close entries that share no terms with the query.
+
+    The index is a read-only replica: writes are rejected rather than kept
+    in memory until the next snapshot replaces them. In fallback mode writes
+    go to Weaviate instead.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LOCAL_INDEX_PATH", "data/local_index")
+        self.sync_interval = float(os.getenv("LOCAL_INDEX_SYNC_INTERVAL", "300"))
+        self.min_similarity = float(os.getenv("LOCAL_INDEX_MIN_SIMILARITY", "0.85"))
+        self.state = _IndexState([], np.zeros((0, 0), dtype=np.float32), None)
+        self.snapshot_name = None
+        self._sync_task = None
+
+    @property
+    def available(self) -> bool:
+        return self.state.snapshot_at is not None
+
+    @property
+    def writable(self) -> bool:
+        return False
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    async def initialize(self):
+        """Load the latest snapshot, if any"""
+        await asyncio.to_thread(self.load)
+
+    async def close(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+    def load(self) -> bool:
+        """Memory-map the current snapshot and rebuild the keyword index"""
+        name = self._current_snapshot()
+        if name is None:
+            logger.warning(f"No local index snapshot in {self.path}")
+            return False
+
+        snapshot_dir = os.path.join(self.path, name)
+        with open(os.path.join(snapshot_dir, "objects.json"), encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+        vectors = np.load(os.path.join(snapshot_dir, "vectors.npy"), mmap_mode="r")
+        self.state = _IndexState(snapshot["objects"], vectors, snapshot["snapshot_at"])
+        self.snapshot_name = name
+        logger.info(f"Loaded local index snapshot with {len(snapshot['objects'])} entries")
+        return True
+
+    def _current_snapshot(self) -> Optional[str]:
+        pointer = os.path.join(self.path, "CURRENT")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, encoding="utf-8") as f:
+            return f.read().strip()
+
+    def write_snapshot(self, objects: List[Dict[str, Any]]):
+        """Write exported objects (with ``_additional.id``/``vector``) as the new snapshot"""
+        name = f"snapshot-{int(time.time() * 1000)}"
+        snapshot_dir = os.path.join(self.path, name)
+        os.makedirs(snapshot_dir)
+
+        dimensions = max((len(obj["_additional"].get("vector") or []) for obj in objects), default=0)
+        vectors = np.zeros((len(objects), dimensions), dtype=np.float32)
+        records = []
+        for row, obj in enumerate(objects):
+            vector = obj["_additional"].get("vector")
+            if vector:
+                vectors[row] = vector
+            record = {field: obj.get(field) for field in FIELDS}
+            record["id"] = obj["_additional"]["id"]
+            records.append(record)
+
+        np.save(os.path.join(snapshot_dir, "vectors.npy"), vectors)
+        with open(os.path.join(snapshot_dir, "objects.json"), "w", encoding="utf-8") as f:
+            json.dump({"snapshot_at": time.time(), "objects": records}, f)
+
+        # Swap the pointer atomically, then drop older snapshots
+        pointer = os.path.join(self.path, "CURRENT")
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(name)
+        os.replace(pointer + ".tmp", pointer)
+        for entry in os.listdir(self.path):
+            if entry.startswith("snapshot-") and entry != name:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+
+    async def sync_from(self, source) -> bool:
+        """Replace the snapshot with a fresh export from ``source`` (a WeaviateManager)"""
+        try:
+            objects = await source.export_objects()
+            await asyncio.to_thread(self.write_snapshot, objects)
+            await asyncio.to_thread(self.load)
+            return True
+        except Exception as e:
+            logger.error(f"Local index sync failed: {e}")
+            return False
+
+    def start_sync(self, source):
+        """Periodically re-sync from ``source`` in the background"""
+        async def _sync_loop():
+            while True:
+                await self.sync_from(source)
+                await asyncio.sleep(self.sync_interval)
+
+        self._sync_task = asyncio.create_task(_sync_loop())
+
+    def start_reload(self):
+        """Periodically pick up snapshots written by another process, e.g. scripts/sync_local_index.py"""
+        async def _reload_loop():
+            while True:
+                await asyncio.sleep(self.sync_interval)
+                try:
+                    if await asyncio.to_thread(self._current_snapshot) != self.snapshot_name:
+                        await asyncio.to_thread(self.load)
+                except Exception as e:
+                    logger.error(f"Local index reload failed: {e}")
+
+        self._sync_task = asyncio.create_task(_reload_loop())
+
+    async def search(self, query: str, limit: int = 5, category: Optional[str] = None, certainty: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Keyword search with vector-similarity expansion; ``certainty`` is ignored"""
+        with span("local_index.search"):
+            return self._search(query, limit, category)
+
+    def _search(self, query: str, limit: int, category: Optional[str]) -> List[Dict[str, Any]]:
+        state = self.state
+        try:
+            keyword = state.bm25(tokenize(query))
+            if not keyword:
+                return []
+
+            best = max(keyword.values())
+            scores = {row: 0.5 * score / best for row, score in keyword.items()}
+
+            # Expand with objects close to the centroid of the top keyword hits
+            vector_rows = [row for row in sorted(keyword, key=keyword.get, reverse=True)[:3]
+                           if row < len(state.vectors) and state.norms[row] > 0]
+            if vector_rows:
+                centroid = np.mean(state.vectors[vector_rows], axis=0)
+                similarities = (state.vectors @ centroid) / (state.norms * np.linalg.norm(centroid) + 1e-9)
+                for row, similarity in enumerate(similarities.tolist()):
+                    if row in scores or similarity >= self.min_similarity:
+                        scores[row] = scores.get(row, 0.0) + 0.5 * max(similarity, 0.0)
+
+            rows = [row for row in scores if category is None or state.objects[row].get("category") == category]
+            rows.sort(key=scores.get, reverse=True)
+            return [state.result(row, {"certainty": scores[row]}) for row in rows[:limit]]
+
+        except Exception as e:
+            logger.error(f"Local search error: {e!r}")
+            return []
+
+    async def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None) -> bool:
+        return self._reject_write("add")
+
+    async def add_knowledge_batch(self, items: List[Dict[str, Any]]) -> List[bool]:
+        return [self._reject_write("add")] * len(items)
+
+    async def update_knowledge(self, object_id: str, title: str = None, content: str = None, category: str = None, tags: List[str] = None) -> bool:
+        return self._reject_write("update")
+
+    async def delete_knowledge(self, object_id: str) -> bool:
+        return self._reject_write("delete")
+
+    def _reject_write(self, operation: str) -> bool:
+        logger.warning(f"Rejected {operation}: the local index is a read-only snapshot")
+        return False
+
+    async def list_all(self, limit: int = 20, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        state = self.state
+        return [state.result(row, {}) for row in state.live_rows(category)[:limit]]
+
+    async def browse_data(self, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        state = self.state
+        items = [state.result(row, {}) for row in state.live_rows()[offset:offset + limit]]
+        return {
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "count": len(items)
+        }
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        state = self.state
+        if state.snapshot_at is None:
+            return {"error": "Local index has no snapshot"}
+        return {
+            "total_entries": len(state.objects),
+            "schema_classes": 1,
+            "timestamp": datetime.fromtimestamp(state.snapshot_at, timezone.utc).isoformat(),
+            "backend": "local"
+        }
+
+    async def health_check(self) -> str:
+        return "local" if self.available else "no_snapshot"
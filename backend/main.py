@@ -1,12 +1,20 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import logging
+import math
+import os
 import time
 from typing import Optional, List, Dict, Any
 
-from weaviate_manager import WeaviateManager
+from weaviate_manager import ChangesExpiredError, WeaviateManager
+from storage_backend import FallbackBackend
+from local_index import LocalIndex
 from chat_processor import ChatProcessor
+from redis_manager import RedisManager
+from write_queue import WriteQueue
+from tracing import TraceExporter, start_trace
+from rate_limiter import RateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,8 +32,26 @@ app.add_middleware(
 )
 
 # Global services
+# STORAGE_BACKEND: "weaviate", "local" (read-only embedded snapshot) or "fallback"
+# (Weaviate, with the embedded index serving reads while it is unavailable)
+storage_mode = os.getenv("STORAGE_BACKEND", "weaviate")
 weaviate_manager = WeaviateManager()
-chat_processor = ChatProcessor(weaviate_manager)
+local_index = LocalIndex() if storage_mode in ("local", "fallback") else None
+# Local mode only: pull snapshots from WEAVIATE_URL whenever it is reachable
+local_sync_from_weaviate = os.getenv("LOCAL_INDEX_SYNC_FROM_WEAVIATE", "false").lower() == "true"
+
+if storage_mode == "local":
+    storage = local_index
+elif storage_mode == "fallback":
+    storage = FallbackBackend(weaviate_manager, local_index)
+else:
+    storage = weaviate_manager
+
+redis_manager = RedisManager()
+write_queue = WriteQueue(storage)
+chat_processor = ChatProcessor(storage, redis_manager, write_queue)
+trace_exporter = TraceExporter()
+rate_limiter = RateLimiter(redis_manager)
 
 class ChatMessage(BaseModel):
     message: str
@@ -37,47 +63,100 @@ class ChatResponse(BaseModel):
     timestamp: float
     action_performed: Optional[str] = None
     data_modified: bool = False
+    operation_id: Optional[str] = None
+    trace_id: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+
+def require_weaviate():
+    """Reject Weaviate-only endpoints on nodes serving just the local index"""
+    if storage_mode == "local":
+        raise HTTPException(status_code=503, detail="Not available with STORAGE_BACKEND=local")
 
 @app.on_startup
 async def startup():
     """Initialize services"""
-    await weaviate_manager.initialize()
+    if storage_mode != "local":
+        try:
+            await weaviate_manager.initialize()
+        except Exception:
+            if storage_mode != "fallback":
+                raise
+            logger.warning("Weaviate unavailable at startup, serving from local index until it reconnects")
+    if local_index:
+        await local_index.initialize()
+        if storage_mode == "fallback" or local_sync_from_weaviate:
+            local_index.start_sync(weaviate_manager)
+        else:
+            # Snapshots come from scripts/sync_local_index.py or are copied in
+            local_index.start_reload()
+    await redis_manager.initialize()
     await chat_processor.initialize()
+    await write_queue.start()
     logger.info("HDMI City Dwellers services initialized")
 
 @app.on_shutdown
 async def shutdown():
     """Cleanup services"""
+    await write_queue.stop()
     await weaviate_manager.close()
+    if local_index:
+        await local_index.close()
+    await redis_manager.close()
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
-    """Main chat endpoint - handles both queries and database commands"""
+async def chat(message: ChatMessage, request: Request, x_debug_trace: Optional[str] = Header(None)):
+    """Main chat endpoint - handles both queries and database commands.
+    
+    Send ``X-Debug-Trace: 1`` to get a per-stage timing breakdown in the response.
+    """
     start_time = time.time()
+    debug = x_debug_trace not in (None, "", "0", "false")
+    trace = start_trace("chat", debug=debug)
+    
+    kind = "write" if chat_processor.is_mutation(message.message) else "read"
+    client_ip = rate_limiter.client_address(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for")
+    )
+    allowed, retry_after = await rate_limiter.check(kind, message.session_id, client_ip)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
     
     try:
         result = await chat_processor.process_message(message.message, message.session_id)
         
         processing_time = time.time() - start_time
-        logger.info(f"Message processed in {processing_time:.3f}s")
+        logger.debug(f"Message processed in {processing_time:.3f}s")
         
         return ChatResponse(
             response=result["response"],
             processing_time=processing_time,
             timestamp=time.time(),
             action_performed=result.get("action"),
-            data_modified=result.get("data_modified", False)
+            data_modified=result.get("data_modified", False),
+            operation_id=result.get("operation_id"),
+            trace_id=trace.trace_id if debug else None,
+            timings=trace.timings() if debug else None
         )
         
     except Exception as e:
         logger.error(f"Error processing message: {e}")
+        trace.root.error = repr(e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    
+    finally:
+        # Failed requests are the ones most worth a breakdown
+        trace_exporter.record(trace)
 
 @app.get("/api/database/stats")
 async def get_database_stats():
     """Get database statistics"""
     try:
-        stats = await weaviate_manager.get_database_stats()
+        stats = await storage.get_database_stats()
         return stats
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
@@ -86,6 +165,7 @@ async def get_database_stats():
 @app.get("/api/database/schema")
 async def get_schema():
     """Get current database schema"""
+    require_weaviate()
     try:
         schema = await weaviate_manager.get_schema()
         return schema
@@ -97,19 +177,43 @@ async def get_schema():
 async def browse_data(limit: int = 10, offset: int = 0):
     """Browse database contents"""
     try:
-        data = await weaviate_manager.browse_data(limit, offset)
+        data = await storage.browse_data(limit, offset)
         return data
     except Exception as e:
         logger.error(f"Error browsing data: {e}")
         raise HTTPException(status_code=500, detail="Failed to browse data")
 
+@app.get("/api/knowledge/changes")
+async def get_changes(since: Optional[str] = None, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """Entries updated or deleted since a timestamp, paged with a cursor"""
+    require_weaviate()
+    try:
+        result = await weaviate_manager.get_changes(since=since, cursor=cursor, limit=limit)
+    except ChangesExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if "error" in result:
+        raise HTTPException(status_code=503, detail=result["error"])
+    return result
+
+@app.get("/api/writes/{operation_id}")
+async def get_write_status(operation_id: str):
+    """Poll the status of a queued write"""
+    status = write_queue.get_status(operation_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown operation ID")
+    return status
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "service": "HDMI City Dwellers",
-        "weaviate": await weaviate_manager.health_check(),
+        "storage_backend": storage_mode,
+        "weaviate": await storage.health_check(),
+        "redis": await redis_manager.health_check(),
         "timestamp": time.time()
     }
 
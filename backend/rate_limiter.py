@@ -0,0 +1,164 @@
+import ipaddress
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from redis_manager import RedisManager
+
+logger = logging.getLogger(__name__)
+
+# Token buckets for every key in KEYS, checked and charged atomically: the
+# request is allowed only if all buckets have ARGV[1] tokens. Each key takes a
+# (capacity, refill per second) pair from ARGV. Returns {allowed, retry_after}.
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(bucket[1]) or capacity
+    local last = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - last) * rate)
+    tokens[i] = available
+    if available < cost then
+        retry_after = math.max(retry_after, (cost - available) / rate)
+    end
+end
+
+local allowed = retry_after == 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local remaining = tokens[i]
+    if allowed then
+        remaining = remaining - cost
+    end
+    redis.call('HSET', key, 'tokens', tostring(remaining), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+
+return {allowed and 1 or 0, tostring(retry_after)}
+"""
+
+class RateLimiter:
+    """Token-bucket rate limiting per session and per client IP.
+
+    Reads and mutating commands draw from separate budgets. The client IP is
+    taken from X-Forwarded-For only when the request comes through one of
+    TRUSTED_PROXIES. Buckets live in
+    Redis and are updated by a single Lua script, so concurrent workers share
+    limits; while Redis is unavailable each process falls back to its own
+    in-memory buckets.
+    """
+
+    def __init__(self, redis_manager: RedisManager):
+        self.redis = redis_manager
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        # (bucket capacity, tokens refilled per second)
+        self.budgets = {
+            "read": (
+                float(os.getenv("RATE_LIMIT_READ_BURST", "30")),
+                float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "60")) / 60
+            ),
+            "write": (
+                float(os.getenv("RATE_LIMIT_WRITE_BURST", "5")),
+                float(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "10")) / 60
+            )
+        }
+        # An IP may carry several sessions (NAT, shared kiosks)
+        self.ip_factor = float(os.getenv("RATE_LIMIT_IP_FACTOR", "5"))
+
+        # A zero rate would divide by zero here and in the script; turning
+        # limits off is what RATE_LIMIT_ENABLED is for
+        if self.enabled:
+            for kind, (capacity, rate) in self.budgets.items():
+                if capacity < 1 or rate <= 0:
+                    raise ValueError(
+                        f"RATE_LIMIT_{kind.upper()}_BURST must be at least 1 and "
+                        f"RATE_LIMIT_{kind.upper()}_PER_MINUTE greater than 0; "
+                        "set RATE_LIMIT_ENABLED=false to disable rate limiting"
+                    )
+            if self.ip_factor <= 0:
+                raise ValueError("RATE_LIMIT_IP_FACTOR must be greater than 0")
+        # Comma-separated addresses or CIDR ranges whose X-Forwarded-For is believed
+        self.trusted_proxies = [
+            ipaddress.ip_network(entry.strip(), strict=False)
+            for entry in os.getenv("TRUSTED_PROXIES", "").split(",")
+            if entry.strip()
+        ]
+        self.local_buckets = OrderedDict()
+        self.max_local_buckets = int(os.getenv("RATE_LIMIT_MAX_LOCAL_BUCKETS", "10000"))
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def client_address(self, peer: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+        """Address to limit by: the peer, or the nearest untrusted X-Forwarded-For hop behind a trusted proxy"""
+        if not peer or not forwarded_for or not self._is_trusted(peer):
+            return peer
+
+        # Walk from our side; everything left of the first untrusted hop is client-supplied
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self._is_trusted(hop):
+                return hop
+        return hops[0] if hops else peer
+
+    async def check(self, kind: str, session_id: Optional[str], client_ip: Optional[str]) -> Tuple[bool, float]:
+        """Charge one request of ``kind`` ("read" or "write"); returns (allowed, retry_after seconds)"""
+        if not self.enabled:
+            return True, 0.0
+
+        capacity, rate = self.budgets[kind]
+        buckets = []
+        # "default" is the ChatMessage fallback every client without an ID shares;
+        # such requests are limited by IP alone
+        if session_id and session_id != "default":
+            buckets.append((f"ratelimit:{kind}:session:{session_id}", capacity, rate))
+        if client_ip:
+            buckets.append((f"ratelimit:{kind}:ip:{client_ip}", capacity * self.ip_factor, rate * self.ip_factor))
+        if not buckets:
+            return True, 0.0
+
+        args = [1]
+        for _, bucket_capacity, bucket_rate in buckets:
+            args.extend([bucket_capacity, bucket_rate])
+
+        result = await self.redis.run_script(TOKEN_BUCKET_SCRIPT, keys=[key for key, _, _ in buckets], args=args)
+        if result is not None:
+            return int(result[0]) == 1, float(result[1])
+
+        return self._check_local(buckets)
+
+    def _check_local(self, buckets: List[Tuple[str, float, float]]) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens = []
+        retry_after = 0.0
+
+        for key, capacity, rate in buckets:
+            available, last = self.local_buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - last) * rate)
+            tokens.append(available)
+            if available < 1:
+                retry_after = max(retry_after, (1 - available) / rate)
+
+        allowed = retry_after == 0
+        for (key, _, _), available in zip(buckets, tokens):
+            self.local_buckets[key] = (available - 1 if allowed else available, now)
+            self.local_buckets.move_to_end(key)
+
+        while len(self.local_buckets) > self.max_local_buckets:
+            self.local_buckets.popitem(last=False)
+
+        return allowed, retry_after
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import redis.asyncio as aioredis
+
+from circuit_breaker import CircuitBreaker
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+class RedisManager:
+    """Pooled Redis access with per-operation timeouts and circuit breaking.
+
+    Every operation goes through ``execute``: when Redis is slow or down the
+    breaker opens and calls return ``None`` immediately instead of adding
+    latency. The connection pool re-establishes connections on its own, so a
+    failed startup ping no longer disables caching for the life of the process.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.pool = None
+        self.scripts: Dict[str, Any] = {}
+        self.url = os.getenv("REDIS_URL", "redis://redis:6379")
+        self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+        self.socket_timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))
+        self.operation_timeout = float(os.getenv("REDIS_OPERATION_TIMEOUT", "0.5"))
+        self.breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=int(os.getenv("REDIS_FAILURE_THRESHOLD", "3")),
+            recovery_timeout=float(os.getenv("REDIS_RECOVERY_TIMEOUT", "5")),
+            slow_call_threshold=float(os.getenv("REDIS_SLOW_CALL_THRESHOLD", "0.2"))
+        )
+
+    async def initialize(self):
+        """Create the connection pool and check connectivity"""
+        try:
+            self.pool = aioredis.ConnectionPool.from_url(
+                self.url,
+                encoding="utf-8",
+                decode_responses=True,
+                max_connections=self.max_connections,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_timeout,
+                health_check_interval=30
+            )
+            self.client = aioredis.Redis(connection_pool=self.pool)
+        except Exception as e:
+            logger.error(f"Invalid Redis configuration: {e}")
+            self.client = None
+            return
+
+        if await self.ping():
+            logger.info("Redis connection pool initialized")
+        else:
+            logger.warning("Redis not reachable yet, will retry on demand")
+
+    @property
+    def available(self) -> bool:
+        """True if Redis is configured and the circuit is not open"""
+        return self.client is not None and self.breaker.state != CircuitBreaker.OPEN
+
+    async def execute(self, operation: str, func: Callable[[Any], Awaitable[Any]]) -> Optional[Any]:
+        """Run ``func(client)`` guarded by the circuit breaker; returns None on failure"""
+        if self.client is None or not self.breaker.allow_request():
+            return None
+
+        start_time = time.perf_counter()
+        try:
+            with span(f"redis.{operation}"):
+                result = await asyncio.wait_for(func(self.client), timeout=self.operation_timeout)
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning(f"Redis {operation} failed: {e!r}")
+            return None
+        except BaseException:
+            # Cancelled: no verdict on Redis, but don't hold the half-open probe
+            self.breaker.release_probe()
+            raise
+
+        self.breaker.record_success(time.perf_counter() - start_time)
+        return result
+
+    async def ping(self) -> bool:
+        return bool(await self.execute("ping", lambda client: client.ping()))
+
+    async def incr(self, key: str) -> Optional[int]:
+        return await self.execute("incr", lambda client: client.incr(key))
+
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Optional[Any]:
+        """Run a Lua script atomically (EVALSHA, loading it on first use)"""
+        def _run(client):
+            if script not in self.scripts:
+                self.scripts[script] = client.register_script(script)
+            return self.scripts[script](keys=keys, args=args)
+
+        return await self.execute("script", _run)
+
+    async def pipeline(self, commands: Sequence[Tuple[str, tuple]]) -> Optional[List[Any]]:
+        """Send several commands in a single round-trip.
+
+        ``commands`` is a sequence of ``(method_name, args)`` pairs, e.g.
+        ``[("get", (key,)), ("incr", (counter_key,))]``. Returns the list of
+        replies in order, or None if Redis is unavailable.
+        """
+        async def _pipeline(client):
+            async with client.pipeline(transaction=False) as pipe:
+                for name, args in commands:
+                    getattr(pipe, name)(*args)
+                return await pipe.execute()
+
+        return await self.execute("pipeline", _pipeline)
+
+    async def health_check(self) -> str:
+        """Check Redis health"""
+        if self.client is None:
+            return "disabled"
+        if self.breaker.state == CircuitBreaker.OPEN:
+            return "circuit_open"
+        return "connected" if await self.ping() else "disconnected"
+
+    async def close(self):
+        """Close the connection pool"""
+        if self.pool is not None:
+            await self.pool.disconnect()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Protocol
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+class Scorer(Protocol):
+    """Scores each candidate's relevance to the query in [0, 1]"""
+
+    def score(self, query: str, items: List[Dict[str, Any]]) -> List[float]:
+        ...
+
+class LexicalScorer:
+    """Fraction of query terms found in each candidate, title hits weighted higher"""
+
+    def __init__(self, title_weight: float = 2.0):
+        self.title_weight = title_weight
+
+    def score(self, query: str, items: List[Dict[str, Any]]) -> List[float]:
+        terms = set(tokenize(query))
+        if not terms:
+            return [0.0] * len(items)
+
+        scores = []
+        for item in items:
+            # Stored properties can be null
+            title_terms = set(tokenize(item.get("title") or ""))
+            content_terms = set(tokenize(item.get("content") or ""))
+            hits = sum(
+                self.title_weight if term in title_terms else 1.0 if term in content_terms else 0.0
+                for term in terms
+            )
+            scores.append(hits / (self.title_weight * len(terms)))
+        return scores
+
+class Reranker:
+    """Reorder over-fetched vector search candidates with a second scorer.
+
+    The final score blends the vector certainty with the scorer's output.
+    Orderings are cached by query and a digest of the candidates' ids, scores
+    and text, so repeated queries over an unchanged candidate set skip the
+    scorer while edited entries are scored afresh.
+    """
+
+    def __init__(self, scorer: Scorer = None):
+        self.scorer = scorer or LexicalScorer()
+        self.enabled = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+        self.candidates = int(os.getenv("RERANK_CANDIDATES", "10"))
+        self.vector_weight = float(os.getenv("RERANK_VECTOR_WEIGHT", "0.5"))
+        self.cache = OrderedDict()
+        self.cache_size = int(os.getenv("RERANK_CACHE_SIZE", "1024"))
+
+    def rerank(self, query: str, items: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """Return the ``top_k`` best candidates, best first"""
+        if len(items) <= 1:
+            return items[:top_k]
+
+        by_id = {item.get("_additional", {}).get("id"): item for item in items}
+        cache_key = (query.lower(), self._digest(items))
+
+        order = self.cache.get(cache_key)
+        if order is None:
+            try:
+                lexical = self.scorer.score(query, items)
+            except Exception as e:
+                logger.warning(f"Rerank scorer failed, keeping vector order: {e}")
+                return items[:top_k]
+
+            scores = [
+                self.vector_weight * item.get("_additional", {}).get("certainty", 0)
+                + (1 - self.vector_weight) * score
+                for item, score in zip(items, lexical)
+            ]
+            ranked = sorted(zip(scores, items), key=lambda pair: pair[0], reverse=True)
+            order = [item.get("_additional", {}).get("id") for _, item in ranked]
+
+            self.cache[cache_key] = order
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(cache_key)
+
+        return [by_id[object_id] for object_id in order[:top_k]]
+
+    @staticmethod
+    def _digest(items: List[Dict[str, Any]]) -> str:
+        candidates = [
+            [
+                item.get("_additional", {}).get("id"),
+                item.get("_additional", {}).get("certainty"),
+                item.get("title"),
+                item.get("content")
+            ]
+            for item in items
+        ]
+        return hashlib.sha1(json.dumps(candidates, default=str).encode()).hexdigest()
@@ -0,0 +1,149 @@
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set by a backend when a read failed and it returned an empty, error or stale
+# result instead of raising
+_read_failed: ContextVar[bool] = ContextVar("read_failed", default=False)
+
+def mark_read_failed():
+    """Flag the current read as failed, see ``StorageBackend``"""
+    _read_failed.set(True)
+
+@contextmanager
+def track_read_failures() -> Iterator[Callable[[], bool]]:
+    """Yield a function telling whether a read in the block failed"""
+    token = _read_failed.set(False)
+    try:
+        yield _read_failed.get
+    finally:
+        _read_failed.reset(token)
+
+class StorageBackend(ABC):
+    """Knowledge base storage used by the chat processor and API.
+
+    Reads never raise: searches and listings return empty results and the
+    dict-returning methods return ``{"error": ...}``, matching WeaviateManager.
+    A read that failed (including one answered from a stale cache) calls
+    ``mark_read_failed()`` so wrappers can tell it apart from an empty result.
+    """
+
+    @property
+    def available(self) -> bool:
+        """False while the backend is known to be failing"""
+        return True
+
+    @property
+    def writable(self) -> bool:
+        """False while writes would fail; defaults to ``available``"""
+        return self.available
+
+    @property
+    def read_only(self) -> bool:
+        """True if the backend never accepts writes, e.g. a local snapshot"""
+        return False
+
+    async def initialize(self):
+        """Connect and prepare the backend"""
+
+    async def close(self):
+        """Release resources"""
+
+    @abstractmethod
+    async def search(self, query: str, limit: int = 5, category: Optional[str] = None, certainty: Optional[float] = None) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    async def add_knowledge_batch(self, items: List[Dict[str, Any]]) -> List[bool]:
+        ...
+
+    @abstractmethod
+    async def update_knowledge(self, object_id: str, title: str = None, content: str = None, category: str = None, tags: List[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete_knowledge(self, object_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_all(self, limit: int = 20, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def browse_data(self, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def get_database_stats(self) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def health_check(self) -> str:
+        ...
+
+class FallbackBackend(StorageBackend):
+    """Serve reads from ``fallback`` when ``primary`` is unavailable or a read on it fails.
+
+    Writes always go to the primary so the fallback stays a read-only replica
+    that is refreshed from snapshots.
+    """
+
+    def __init__(self, primary: StorageBackend, fallback: StorageBackend):
+        self.primary = primary
+        self.fallback = fallback
+
+    @property
+    def available(self) -> bool:
+        return self.primary.available or self.fallback.available
+
+    @property
+    def writable(self) -> bool:
+        return self.primary.writable
+
+    async def _read(self, method: str, *args, **kwargs):
+        if self.primary.available or not self.fallback.available:
+            with track_read_failures() as read_failed:
+                result = await getattr(self.primary, method)(*args, **kwargs)
+                failed = read_failed()
+            if not failed or not self.fallback.available:
+                return result
+        logger.info(f"Serving {method} from fallback backend")
+        return await getattr(self.fallback, method)(*args, **kwargs)
+
+    async def search(self, query: str, limit: int = 5, category: Optional[str] = None, certainty: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self._read("search", query, limit=limit, category=category, certainty=certainty)
+
+    async def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None) -> bool:
+        return await self.primary.add_knowledge(title, content, category, tags)
+
+    async def add_knowledge_batch(self, items: List[Dict[str, Any]]) -> List[bool]:
+        return await self.primary.add_knowledge_batch(items)
+
+    async def update_knowledge(self, object_id: str, title: str = None, content: str = None, category: str = None, tags: List[str] = None) -> bool:
+        return await self.primary.update_knowledge(object_id, title=title, content=content, category=category, tags=tags)
+
+    async def delete_knowledge(self, object_id: str) -> bool:
+        return await self.primary.delete_knowledge(object_id)
+
+    async def list_all(self, limit: int = 20, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._read("list_all", limit=limit, category=category)
+
+    async def browse_data(self, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        return await self._read("browse_data", limit, offset)
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        return await self._read("get_database_stats")
+
+    async def health_check(self) -> str:
+        primary = await self.primary.health_check()
+        if primary == "connected":
+            return primary
+        return f"{primary} (fallback: {await self.fallback.health_check()})"
@@ -0,0 +1,74 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from rate_limiter import RateLimiter
+from redis_manager import RedisManager
+
+@pytest.fixture(autouse=True)
+def budgets(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_READ_BURST", "3")
+    monkeypatch.setenv("RATE_LIMIT_READ_PER_MINUTE", "600")
+    monkeypatch.setenv("RATE_LIMIT_IP_FACTOR", "2")
+    monkeypatch.setenv("TRUSTED_PROXIES", "172.28.0.10,10.0.0.0/8")
+
+@pytest.fixture(params=["redis", "local"])
+def limiter(request):
+    """Backed by the Lua script on fake Redis, or by the in-memory fallback"""
+    redis_manager = RedisManager()
+    if request.param == "redis":
+        redis_manager.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return RateLimiter(redis_manager)
+
+def run(limiter, requests):
+    """Send (session_id, client_ip) pairs in order, or sleep for a number; returns the checks' results"""
+    async def _send():
+        results = []
+        for request in requests:
+            if isinstance(request, (int, float)):
+                await asyncio.sleep(request)
+            else:
+                results.append(await limiter.check("read", *request))
+        return results
+
+    results = asyncio.run(_send())
+    if limiter.redis.client is not None:
+        # Served by the script, not by the fallback
+        assert not limiter.local_buckets
+    return results
+
+def test_burst_then_denied_with_retry_after(limiter):
+    results = run(limiter, [("s1", "1.2.3.4")] * 4)
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(0.1, abs=0.02)
+
+def test_tokens_refill(limiter):
+    results = run(limiter, [("s1", None)] * 4 + [0.15, ("s1", None), ("s1", None)])
+    assert [allowed for allowed, _ in results] == [True, True, True, False, True, False]
+
+def test_denied_request_does_not_charge_other_buckets(limiter):
+    # The IP allows 6; a request denied by its session bucket must not use any of them
+    results = run(limiter, [("s1", "1.2.3.4")] * 4 + [("s2", "1.2.3.4")] * 3 + [("s3", "1.2.3.4")])
+    assert [allowed for allowed, _ in results] == [True, True, True, False, True, True, True, False]
+
+def test_default_session_limited_by_ip_only(limiter):
+    results = run(limiter, [("default", "1.2.3.4")] * 7 + [("default", "5.6.7.8"), (None, "5.6.7.8")])
+    assert [allowed for allowed, _ in results] == [True] * 6 + [False, True, True]
+
+def test_client_address_from_trusted_proxy():
+    limiter = RateLimiter(RedisManager())
+    # Only hops added by trusted proxies are believed
+    assert limiter.client_address("172.28.0.10", "6.6.6.6, 1.2.3.4") == "1.2.3.4"
+    assert limiter.client_address("172.28.0.10", "1.2.3.4, 10.0.0.7") == "1.2.3.4"
+    assert limiter.client_address("172.28.0.1", "1.2.3.4") == "172.28.0.1"
+    assert limiter.client_address("172.28.0.10", None) == "172.28.0.10"
+
+def test_invalid_budget_rejected(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_WRITE_PER_MINUTE", "0")
+    with pytest.raises(ValueError):
+        RateLimiter(RedisManager())
+
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    RateLimiter(RedisManager())
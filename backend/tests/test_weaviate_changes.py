@@ -0,0 +1,139 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from weaviate_manager import ChangesExpiredError, WeaviateManager, _parse_date
+
+class FakeQuery:
+    """The slice of the v3 query builder get_changes uses"""
+
+    def __init__(self, objects, class_name):
+        self.objects = objects
+        self.class_name = class_name
+        self.where = None
+        self.sort = None
+        self.limit = None
+
+    def with_where(self, where):
+        self.where = where
+        return self
+
+    def with_sort(self, sort):
+        self.sort = sort
+        return self
+
+    def with_limit(self, limit):
+        self.limit = limit
+        return self
+
+    def with_additional(self, properties):
+        return self
+
+    def _matches(self, obj, where):
+        if where["operator"] == "And":
+            return all(self._matches(obj, operand) for operand in where["operands"])
+        value = _parse_date(obj[where["path"][0]])
+        bound = _parse_date(where["valueDate"])
+        return value >= bound if where["operator"] == "GreaterThanEqual" else value < bound
+
+    def do(self):
+        found = [dict(obj) for obj in self.objects if self.where is None or self._matches(obj, self.where)]
+        if self.sort:
+            found.sort(key=lambda obj: _parse_date(obj[self.sort["path"][0]]))
+        return {"data": {"Get": {self.class_name: found[:self.limit]}}}
+
+class FakeClient:
+    def __init__(self):
+        self.store = {"KnowledgeBase": [], "KnowledgeTombstone": []}
+        self.query = self
+
+    def get(self, class_name, properties):
+        return FakeQuery(self.store[class_name], class_name)
+
+    def upsert(self, object_id, when):
+        self.store["KnowledgeBase"].append({
+            "title": object_id, "content": "", "category": "general", "tags": [],
+            "created_at": when.isoformat(), "updated_at": when.isoformat(),
+            "_additional": {"id": object_id}
+        })
+
+    def delete(self, object_id, when):
+        self.store["KnowledgeTombstone"].append({"object_id": object_id, "deleted_at": when.isoformat()})
+
+@pytest.fixture
+def feed(monkeypatch):
+    monkeypatch.setenv("CHANGES_SAFETY_LAG", "60")
+    monkeypatch.setenv("TOMBSTONE_RETENTION_DAYS", "1")
+    manager = WeaviateManager()
+    client = FakeClient()
+    manager.clients = {op_type: client for op_type in manager.timeouts}
+    yield manager, client
+    for executor in (manager.read_executor, manager.write_executor, manager.batch_executor):
+        executor.shutdown()
+
+def changes(manager, **kwargs):
+    return asyncio.run(manager.get_changes(**kwargs))
+
+def cursor_at(when, ids=()):
+    return base64.urlsafe_b64encode(json.dumps({"t": when.isoformat(), "ids": list(ids)}).encode()).decode()
+
+def test_entries_sharing_a_timestamp_span_pages(feed):
+    manager, client = feed
+    when = datetime.now(timezone.utc) - timedelta(hours=1)
+    for object_id in ("c", "a", "b"):
+        client.upsert(object_id, when)
+    client.delete("d", when)
+
+    first = changes(manager, since=(when - timedelta(minutes=1)).isoformat(), limit=3)
+    assert [change["id"] for change in first["changes"]] == ["a", "b", "c"]
+    assert first["has_more"]
+
+    second = changes(manager, cursor=first["cursor"], limit=3)
+    assert [(change["id"], change["change"]) for change in second["changes"]] == [("d", "delete")]
+    assert not second["has_more"]
+
+def test_recent_entries_held_back_by_safety_lag(feed):
+    manager, client = feed
+    now = datetime.now(timezone.utc)
+    client.upsert("settled", now - timedelta(minutes=5))
+    client.upsert("fresh", now - timedelta(seconds=10))
+
+    result = changes(manager, since=(now - timedelta(hours=1)).isoformat())
+    assert [change["id"] for change in result["changes"]] == ["settled"]
+    assert _parse_date(result["checked_through"]) < now - timedelta(seconds=59)
+
+    manager.changes_safety_lag = 0
+    result = changes(manager, cursor=result["cursor"])
+    assert [change["id"] for change in result["changes"]] == ["fresh"]
+
+def test_idle_cursor_advances_to_horizon(feed):
+    manager, _ = feed
+    now = datetime.now(timezone.utc)
+    result = changes(manager, cursor=cursor_at(now - timedelta(hours=12), ["gone"]))
+    assert result["changes"] == []
+    assert not result["has_more"]
+
+    position = json.loads(base64.urlsafe_b64decode(result["cursor"].encode()))
+    assert position["ids"] == []
+    assert now - timedelta(seconds=61) < _parse_date(position["t"]) < now - timedelta(seconds=59)
+
+def test_sync_older_than_retention_expires(feed):
+    manager, client = feed
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    client.upsert("a", old)
+
+    with pytest.raises(ChangesExpiredError):
+        changes(manager, since=old.isoformat())
+    with pytest.raises(ChangesExpiredError):
+        changes(manager, cursor=cursor_at(old))
+
+    # A full sync has nothing to miss
+    assert [change["id"] for change in changes(manager)["changes"]] == ["a"]
+
+def test_malformed_cursor_rejected(feed):
+    manager, _ = feed
+    with pytest.raises(ValueError):
+        changes(manager, cursor="not-a-cursor")
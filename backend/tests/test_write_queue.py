@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from write_queue import WriteQueue
+
+class FakeBackend:
+    """Records applied writes; ``failures`` maps an object id to how many writes to it fail"""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.objects = {}
+        self.calls = []
+        self.writable = True
+        self.read_only = False
+
+    def _fails(self, object_id):
+        if self.failures.get(object_id, 0) > 0:
+            self.failures[object_id] -= 1
+            return True
+        return False
+
+    async def add_knowledge_batch(self, items):
+        self.calls.extend(("add", item["id"], item) for item in items)
+        flags = []
+        for item in items:
+            ok = not self._fails(item["id"])
+            if ok:
+                self.objects[item["id"]] = dict(item)
+            flags.append(ok)
+        return flags
+
+    async def update_knowledge(self, object_id, title=None, content=None, category=None, tags=None):
+        fields = {key: value for key, value in
+                  {"title": title, "content": content, "category": category, "tags": tags}.items()
+                  if value is not None}
+        self.calls.append(("update", object_id, fields))
+        if self._fails(object_id):
+            return False
+        self.objects.setdefault(object_id, {}).update(fields)
+        return True
+
+    async def delete_knowledge(self, object_id):
+        self.calls.append(("delete", object_id, {}))
+        if self._fails(object_id):
+            return False
+        self.objects.pop(object_id, None)
+        return True
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    path = tmp_path / "write_journal.jsonl"
+    monkeypatch.setenv("WRITE_BEHIND_ENABLED", "true")
+    monkeypatch.setenv("WRITE_JOURNAL_PATH", str(path))
+    monkeypatch.setenv("WRITE_BATCH_INTERVAL", "0.01")
+    monkeypatch.setenv("WRITE_RETRY_BACKOFF", "0.01")
+    monkeypatch.setenv("WRITE_MAX_ATTEMPTS", "3")
+    return path
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+async def drained(queue):
+    await wait_for(lambda: queue._idle() and all(
+        status["status"] in ("applied", "failed") for status in queue.operations.values()
+    ))
+
+def test_replay_applies_pending_operations(journal):
+    records = [
+        {"op_id": "a", "type": "add", "payload": {"id": "obj-a", "title": "A"}, "submitted_at": 1},
+        {"op_id": "b", "type": "delete", "payload": {"object_id": "obj-b"}, "submitted_at": 2},
+        {"op_id": "c", "type": "update", "payload": {"query": "old", "content": "new"}, "submitted_at": 3},
+        {"op_id": "b", "done": True},
+        {"op_id": "c", "resolved": "obj-c"},
+    ]
+    journal.write_text("".join(json.dumps(record) + "\n" for record in records) + '{"op_id": "d", "ty')
+
+    async def resolver(query):
+        raise AssertionError("resolved target should be replayed from the journal")
+
+    async def scenario():
+        backend = FakeBackend()
+        queue = WriteQueue(backend)
+        queue.set_resolver(resolver)
+        await queue.start()
+        try:
+            await drained(queue)
+        finally:
+            await queue.stop()
+        return backend, queue
+
+    backend, queue = asyncio.run(scenario())
+    assert [(kind, object_id) for kind, object_id, _ in backend.calls] == [("add", "obj-a"), ("update", "obj-c")]
+    assert backend.objects["obj-c"] == {"content": "new"}
+    assert set(queue.operations) == {"a", "c"}
+    assert journal.read_text() == ""
+
+def test_journal_compacted_once_applied(journal):
+    async def scenario():
+        backend = FakeBackend()
+        queue = WriteQueue(backend)
+        await queue.start()
+        try:
+            op_id = await queue.submit("add", title="T", content="C", category="general")
+            assert json.loads(journal.read_text().splitlines()[0])["op_id"] == op_id
+            await drained(queue)
+        finally:
+            await queue.stop()
+        return backend, queue.get_status(op_id)
+
+    backend, status = asyncio.run(scenario())
+    assert status["status"] == "applied"
+    assert backend.objects[status["object_id"]]["title"] == "T"
+    assert journal.read_text() == ""
+
+def test_failing_operation_retried_until_out_of_attempts(journal):
+    async def scenario():
+        backend = FakeBackend(failures={"obj-1": 10})
+        queue = WriteQueue(backend)
+        await queue.start()
+        try:
+            op_id = await queue.submit("update", object_id="obj-1", content="x")
+            await drained(queue)
+        finally:
+            await queue.stop()
+        return backend, queue.get_status(op_id)
+
+    backend, status = asyncio.run(scenario())
+    assert status["status"] == "failed"
+    assert status["attempts"] == 3
+    assert len(backend.calls) == 3
+    assert journal.read_text() == ""
+
+def test_unfinished_operation_stays_in_journal(journal):
+    async def scenario():
+        backend = FakeBackend(failures={"obj-1": 10})
+        queue = WriteQueue(backend)
+        queue.retry_backoff = 60
+        await queue.start()
+        try:
+            op_id = await queue.submit("delete", object_id="obj-1")
+            await wait_for(lambda: queue.get_status(op_id)["status"] == "retrying")
+        finally:
+            await queue.stop()
+        return op_id
+
+    op_id = asyncio.run(scenario())
+    assert [operation["op_id"] for operation in WriteQueue(FakeBackend())._read_pending()] == [op_id]
+
+def test_retry_does_not_overwrite_later_update(journal):
+    async def scenario():
+        backend = FakeBackend(failures={"obj-1": 1})
+        queue = WriteQueue(backend)
+        await queue.start()
+        try:
+            first = await queue.submit("update", object_id="obj-1", content="v1")
+            await wait_for(lambda: queue.get_status(first)["status"] == "retrying")
+            second = await queue.submit("update", object_id="obj-1", content="v2")
+            await drained(queue)
+        finally:
+            await queue.stop()
+        return backend, queue.get_status(first), queue.get_status(second)
+
+    backend, first, second = asyncio.run(scenario())
+    assert first["status"] == second["status"] == "applied"
+    assert first["attempts"] == 2
+    assert backend.calls[-1] == ("update", "obj-1", {"content": "v2"})
+    assert backend.objects["obj-1"] == {"content": "v2"}
+
+def test_query_resolved_by_worker(journal):
+    async def resolver(query):
+        if query == "smart city":
+            return {"title": "Smart City", "_additional": {"id": "obj-9"}}
+        return None
+
+    async def scenario():
+        backend = FakeBackend()
+        backend.objects["obj-9"] = {"title": "Smart City"}
+        queue = WriteQueue(backend)
+        queue.set_resolver(resolver)
+        await queue.start()
+        try:
+            found = await queue.submit("delete", query="smart city")
+            missing = await queue.submit("delete", query="nothing")
+            await drained(queue)
+        finally:
+            await queue.stop()
+        return backend, queue.get_status(found), queue.get_status(missing)
+
+    backend, found, missing = asyncio.run(scenario())
+    assert found["status"] == "applied"
+    assert found["object_id"] == "obj-9"
+    assert found["title"] == "Smart City"
+    assert "obj-9" not in backend.objects
+    assert missing["status"] == "failed"
+    assert missing["attempts"] == 1
+    assert "No items found" in missing["error"]
+
+def test_read_only_backend_disables_write_behind(journal):
+    async def scenario():
+        backend = FakeBackend()
+        backend.read_only = True
+        queue = WriteQueue(backend)
+        await queue.start()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert not queue.enabled
+    assert queue._worker is None
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "hdmi-city-dwellers"
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    """A timed stage of a request, shaped after OpenTelemetry spans"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        attributes = dict(self.attributes)
+        if self.error:
+            attributes["error.message"] = self.error
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": {"stringValue": str(value)}} for key, value in attributes.items()],
+            "status": {"code": 2 if self.error else 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class Trace:
+    """All spans recorded while handling one request"""
+
+    def __init__(self, name: str, debug: bool = False):
+        self.trace_id = secrets.token_hex(16)
+        self.debug = debug
+        self.spans: List[Span] = []
+        self.root = Span(name, self.trace_id, None, {})
+        self.spans.append(self.root)
+
+    def finish(self):
+        self.root.end_ns = time.time_ns()
+
+    def timings(self) -> Dict[str, float]:
+        """Milliseconds per stage; repeated stages are summed"""
+        timings = {}
+        for span in self.spans[1:]:
+            timings[span.name] = round(timings.get(span.name, 0.0) + span.duration_ms, 3)
+        timings["total"] = round(self.root.duration_ms, 3)
+        return timings
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON export payload"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [span.to_otlp() for span in self.spans]
+                }]
+            }]
+        }
+
+def start_trace(name: str, debug: bool = False) -> Trace:
+    """Begin tracing the current request; stages recorded with ``span`` attach to it"""
+    trace = Trace(name, debug=debug)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage of the current request; a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = repr(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+class TraceExporter:
+    """Decide which finished traces to keep, log slow ones and export them.
+
+    Traces are exported when debug tracing was requested, when the request
+    failed (its root span has an error), when it was slower than
+    ``slow_threshold`` or when picked by ``TRACE_SAMPLE_RATE``.
+    Exports go to a JSONL file and/or an OTLP/HTTP collector, off the request
+    path. Slow requests are logged with their stage breakdown, sampled by
+    ``SLOW_REQUEST_LOG_RATE``.
+    """
+
+    def __init__(self):
+        self.export_file = os.getenv("TRACE_EXPORT_FILE")
+        self.collector_url = os.getenv("TRACE_COLLECTOR_URL")
+        self.sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+        self.slow_threshold = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1.0"))
+        self.slow_log_rate = float(os.getenv("SLOW_REQUEST_LOG_RATE", "1.0"))
+        self._pending = set()
+
+    def record(self, trace: Trace):
+        trace.finish()
+        slow = trace.root.duration_ms / 1000 > self.slow_threshold
+        failed = trace.root.error is not None
+
+        if failed:
+            logger.warning(f"Failed request {trace.trace_id} ({trace.root.duration_ms:.0f}ms): {json.dumps(trace.timings())}")
+        elif slow and random.random() < self.slow_log_rate:
+            logger.warning(f"Slow request {trace.trace_id} ({trace.root.duration_ms:.0f}ms): {json.dumps(trace.timings())}")
+
+        if not (self.export_file or self.collector_url):
+            return
+        if trace.debug or failed or slow or random.random() < self.sample_rate:
+            task = asyncio.create_task(self._export(trace.to_otlp()))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _export(self, payload: Dict[str, Any]):
+        try:
+            if self.export_file:
+                await asyncio.to_thread(self._append, json.dumps(payload))
+            if self.collector_url:
+                async with httpx.AsyncClient(timeout=2.0) as client:
+                    await client.post(self.collector_url, json=payload)
+        except Exception as e:
+            logger.warning(f"Trace export failed: {e}")
+
+    def _append(self, line: str):
+        with open(self.export_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
@@ -2,37 +2,266 @@ import weaviate
 import asyncio
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Hashable
 import uuid
-from datetime import datetime
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from storage_backend import StorageBackend, mark_read_failed
+from tracing import span
 
 logger = logging.getLogger(__name__)
 
-class WeaviateManager:
+def _now() -> str:
+    """Current time as RFC3339, as required by Weaviate date properties"""
+    return datetime.now(timezone.utc).isoformat()
+
+def _parse_date(value: str) -> datetime:
+    """Parse an ISO/RFC3339 timestamp, assuming UTC when no offset is given"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+class ChangesExpiredError(ValueError):
+    """Raised when a change feed sync resumes from before the tombstone retention window"""
+
+class WeaviateManager(StorageBackend):
     def __init__(self):
         self.client = None
         self.url = os.getenv("WEAVIATE_URL", "http://weaviate:8080")
         self.api_key = os.getenv("WEAVIATE_API_KEY")
         
+        # Per-operation deadlines (seconds); writes include vectorization
+        self.timeouts = {
+            "search": float(os.getenv("WEAVIATE_SEARCH_TIMEOUT", "3")),
+            "read": float(os.getenv("WEAVIATE_READ_TIMEOUT", "5")),
+            "write": float(os.getenv("WEAVIATE_WRITE_TIMEOUT", "20")),
+            "batch": float(os.getenv("WEAVIATE_BATCH_TIMEOUT", "30")),
+            "admin": float(os.getenv("WEAVIATE_ADMIN_TIMEOUT", "10"))
+        }
+        # Separate breakers so a burst of slow writes can't take searches down
+        self.breakers = {
+            kind: CircuitBreaker(
+                f"weaviate-{kind}",
+                failure_threshold=int(os.getenv("WEAVIATE_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv("WEAVIATE_RECOVERY_TIMEOUT", "15"))
+            )
+            for kind in ("read", "write")
+        }
+        self.max_read_attempts = int(os.getenv("WEAVIATE_MAX_READ_ATTEMPTS", "2"))
+        # Extra hedge/retry attempts allowed in flight across all requests
+        self.max_hedges = int(os.getenv("WEAVIATE_MAX_HEDGES", "4"))
+        self.hedges_in_flight = 0
+        # One client per operation type so the HTTP read timeout matches the
+        # deadline and abandoned calls free their thread at about the same time
+        self.clients: Dict[str, Any] = {}
+        self.connect_lock = asyncio.Lock()
+        # Dedicated pools keep Weaviate calls off the default executor. Batch
+        # calls share the client's batch buffer, so they get a single worker
+        # of their own; a timed-out batch then never overlaps the next one
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("WEAVIATE_READ_WORKERS", "16")),
+            thread_name_prefix="weaviate-read"
+        )
+        self.write_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("WEAVIATE_WRITE_WORKERS", "4")),
+            thread_name_prefix="weaviate-write"
+        )
+        self.batch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weaviate-batch")
+        self.latencies = {op_type: deque(maxlen=200) for op_type in self.timeouts}
+        self.stale_cache = OrderedDict()
+        self.stale_cache_size = int(os.getenv("WEAVIATE_STALE_CACHE_SIZE", "512"))
+        self.min_certainty = float(os.getenv("SEARCH_MIN_CERTAINTY", "0.6"))
+        self.tombstone_retention_days = float(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+        self.tombstone_prune_interval = float(os.getenv("TOMBSTONE_PRUNE_INTERVAL", "3600"))
+        # Longer than any write can take to land after its timestamp is taken
+        self.changes_safety_lag = float(os.getenv("CHANGES_SAFETY_LAG", str(max(self.timeouts.values()) + 5)))
+        self.last_prune = float("-inf")
+        self._prune_task = None
+        
     async def initialize(self):
         """Initialize Weaviate client and setup schema"""
         try:
-            self.client = weaviate.Client(
-                url=self.url,
-                auth_client_secret=weaviate.AuthApiKey(self.api_key),
-                timeout_config=(10, 30),
-            )
+            await self._connect()
+        except Exception as e:
+            logger.error(f"Failed to initialize Weaviate client: {e}")
+            raise
+    
+    async def _connect(self):
+        """Create the clients and set up the schema.
+        
+        The clients are only kept once both succeed; until then every call
+        retries the connection (subject to the circuit breaker), so a process
+        started while Weaviate was down recovers when it comes back.
+        """
+        async with self.connect_lock:
+            if self.clients:
+                return
+            
+            def _create_clients():
+                return {
+                    op_type: weaviate.Client(
+                        url=self.url,
+                        auth_client_secret=weaviate.AuthApiKey(self.api_key),
+                        timeout_config=(min(5, timeout), timeout),
+                    )
+                    for op_type, timeout in self.timeouts.items()
+                }
+            
+            clients = await asyncio.to_thread(_create_clients)
+            self.client = clients["admin"]
             
             # Test connection
             await asyncio.to_thread(self.client.schema.get)
-            logger.info("Weaviate client initialized successfully")
             
             # Setup schema
             await self.setup_schema()
             
-        except Exception as e:
-            logger.error(f"Failed to initialize Weaviate client: {e}")
+            self.clients = clients
+            logger.info("Weaviate client initialized successfully")
+    
+    @property
+    def available(self) -> bool:
+        """False while the read circuit breaker is rejecting calls"""
+        return self.breakers["read"].state != CircuitBreaker.OPEN
+    
+    @property
+    def writable(self) -> bool:
+        """False while the write circuit breaker is rejecting calls"""
+        return self.breakers["write"].state != CircuitBreaker.OPEN
+    
+    def _breaker(self, op_type: str) -> CircuitBreaker:
+        return self.breakers["write" if op_type in ("write", "batch") else "read"]
+    
+    def _submit(self, op_type: str, func: Callable[[Any], Any]) -> asyncio.Future:
+        """Run ``func(client)`` on the pool for the operation type"""
+        executor = {"write": self.write_executor, "batch": self.batch_executor}.get(op_type, self.read_executor)
+        return asyncio.get_running_loop().run_in_executor(executor, func, self.clients[op_type])
+    
+    def _submit_extra(self, op_type: str, func: Callable[[Any], Any]) -> Optional[asyncio.Future]:
+        """Start a hedge or retry attempt, unless too many are already in flight"""
+        if self.hedges_in_flight >= self.max_hedges:
+            return None
+        self.hedges_in_flight += 1
+        future = self._submit(op_type, func)
+        
+        def _release(_):
+            self.hedges_in_flight -= 1
+        
+        future.add_done_callback(_release)
+        return future
+    
+    async def _run(self, op_type: str, func: Callable[[Any], Any], idempotent: bool = False) -> Any:
+        """Run a blocking client call with the operation's deadline and circuit breaker.
+        
+        Idempotent reads are hedged: if the first attempt is slower than the
+        recent p95 latency (or fails), a second attempt is started and the first
+        successful result wins.
+        
+        A call that times out before any attempt left the executor queue is not
+        held against the breaker: the backlog is ours, not Weaviate's.
+        """
+        breaker = self._breaker(op_type)
+        if not breaker.allow_request():
+            raise CircuitOpenError("Weaviate circuit is open")
+        
+        started = []
+        
+        def _call(client):
+            started.append(True)
+            return func(client)
+        
+        start_time = time.perf_counter()
+        try:
+            with span(f"weaviate.{op_type}"):
+                if not self.clients:
+                    # A connect that times out does count
+                    started.append(True)
+                    await asyncio.wait_for(self._connect(), self.timeouts["admin"])
+                    started.clear()
+                if idempotent:
+                    result = await asyncio.wait_for(self._hedged(op_type, _call), self.timeouts[op_type])
+                else:
+                    result = await asyncio.wait_for(self._submit(op_type, _call), self.timeouts[op_type])
+        except asyncio.TimeoutError:
+            if started:
+                breaker.record_failure()
+            else:
+                breaker.release_probe()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release_probe()
             raise
+        
+        duration = time.perf_counter() - start_time
+        breaker.record_success(duration)
+        self.latencies[op_type].append(duration)
+        return result
+    
+    async def _hedged(self, op_type: str, func: Callable[[Any], Any]) -> Any:
+        delay = self._hedge_delay(op_type)
+        tasks = {self._submit(op_type, func)}
+        attempts = 1
+        error = None
+        
+        try:
+            while tasks:
+                can_hedge = attempts < self.max_read_attempts
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                
+                # Hedge on a slow attempt, retry on a failed one
+                if can_hedge and (not done or not tasks):
+                    attempts += 1
+                    extra = self._submit_extra(op_type, func)
+                    if extra is not None:
+                        if done:
+                            logger.warning(f"Retrying Weaviate {op_type} after error: {error}")
+                        tasks.add(extra)
+            
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _hedge_delay(self, op_type: str) -> float:
+        """Recent p95 latency for the operation type, or a quarter of its deadline"""
+        samples = sorted(self.latencies[op_type])
+        if len(samples) < 20:
+            return self.timeouts[op_type] / 4
+        return max(samples[int(len(samples) * 0.95) - 1], 0.05)
+    
+    def _remember(self, key: Hashable, value: Any):
+        """Keep the last good result of a read to serve while Weaviate is unhealthy"""
+        self.stale_cache[key] = value
+        self.stale_cache.move_to_end(key)
+        while len(self.stale_cache) > self.stale_cache_size:
+            self.stale_cache.popitem(last=False)
+    
+    def _stale(self, key: Hashable, error: Exception) -> Optional[Any]:
+        # Every failed read ends up here; tell FallbackBackend not to trust the result
+        mark_read_failed()
+        value = self.stale_cache.get(key)
+        if value is not None:
+            logger.warning(f"Serving stale result for {key[0]} after error: {error!r}")
+        return value
     
     async def setup_schema(self):
         """Setup basic knowledge base schema"""
@@ -87,18 +316,44 @@ class WeaviateManager:
                 await asyncio.to_thread(self.client.schema.create_class, kb_schema)
                 logger.info("Created KnowledgeBase schema")
             
+            if "KnowledgeTombstone" not in classes:
+                tombstone_schema = {
+                    "class": "KnowledgeTombstone",
+                    "vectorizer": "none",
+                    "properties": [
+                        {
+                            "name": "object_id",
+                            "dataType": ["string"],
+                            "indexFilterable": True,
+                            "indexSearchable": False
+                        },
+                        {
+                            "name": "deleted_at",
+                            "dataType": ["date"],
+                            "indexFilterable": True,
+                            "indexSearchable": False
+                        }
+                    ]
+                }
+                
+                await asyncio.to_thread(self.client.schema.create_class, tombstone_schema)
+                logger.info("Created KnowledgeTombstone schema")
+            
         except Exception as e:
             logger.error(f"Failed to setup schema: {e}")
             raise
     
-    async def search(self, query: str, limit: int = 5, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def search(self, query: str, limit: int = 5, category: Optional[str] = None, certainty: Optional[float] = None) -> List[Dict[str, Any]]:
         """Search the knowledge base"""
+        if certainty is None:
+            certainty = self.min_certainty
+        cache_key = ("search", query.lower(), limit, category, certainty)
         try:
-            def _search():
+            def _search(client):
                 query_builder = (
-                    self.client.query
+                    client.query
                     .get("KnowledgeBase", ["title", "content", "category", "created_at", "tags"])
-                    .with_near_text({"concepts": [query], "certainty": 0.6})
+                    .with_near_text({"concepts": [query], "certainty": certainty})
                     .with_limit(limit)
                     .with_additional(["certainty", "id"])
                 )
@@ -112,12 +367,16 @@ class WeaviateManager:
                 
                 return query_builder.do()
             
-            result = await asyncio.to_thread(_search)
+            result = await self._run("search", _search, idempotent=True)
             items = result.get('data', {}).get('Get', {}).get('KnowledgeBase', [])
+            self._remember(cache_key, items)
             return items
             
         except Exception as e:
-            logger.error(f"Search error: {e}")
+            stale = self._stale(cache_key, e)
+            if stale is not None:
+                return stale
+            logger.error(f"Search error: {e!r}")
             return []
     
     async def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None) -> bool:
@@ -126,20 +385,20 @@ class WeaviateManager:
             if tags is None:
                 tags = []
                 
-            def _add():
-                return self.client.data_object.create(
+            def _add(client):
+                return client.data_object.create(
                     data_object={
                         "title": title,
                         "content": content,
                         "category": category,
-                        "created_at": datetime.now().isoformat(),
-                        "updated_at": datetime.now().isoformat(),
+                        "created_at": _now(),
+                        "updated_at": _now(),
                         "tags": tags
                     },
                     class_name="KnowledgeBase"
                 )
             
-            result = await asyncio.to_thread(_add)
+            result = await self._run("write", _add)
             logger.info(f"Added knowledge: {title}")
             return True
             
@@ -147,10 +406,49 @@ class WeaviateManager:
             logger.error(f"Failed to add knowledge: {e}")
             return False
     
+    async def add_knowledge_batch(self, items: List[Dict[str, Any]]) -> List[bool]:
+        """Add several entries in one batch request.
+        
+        Each item has ``id``, ``title``, ``content`` and optionally ``category``
+        and ``tags``. Batch imports upsert by id, so replaying a batch is safe.
+        Returns one success flag per item.
+        """
+        try:
+            now = _now()
+            
+            def _add_batch(client):
+                for item in items:
+                    client.batch.add_data_object(
+                        data_object={
+                            "title": item["title"],
+                            "content": item["content"],
+                            "category": item.get("category", "general"),
+                            "created_at": now,
+                            "updated_at": now,
+                            "tags": item.get("tags") or []
+                        },
+                        class_name="KnowledgeBase",
+                        uuid=item["id"]
+                    )
+                return client.batch.create_objects()
+            
+            results = await self._run("batch", _add_batch)
+            failed = {
+                result.get("id")
+                for result in results or []
+                if result.get("result", {}).get("errors")
+            }
+            logger.info(f"Added {len(items) - len(failed)}/{len(items)} knowledge entries in batch")
+            return [item["id"] not in failed for item in items]
+        
+        except Exception as e:
+            logger.error(f"Failed to add knowledge batch: {e}")
+            return [False] * len(items)
+    
     async def update_knowledge(self, object_id: str, title: str = None, content: str = None, category: str = None, tags: List[str] = None) -> bool:
         """Update existing knowledge"""
         try:
-            update_data = {"updated_at": datetime.now().isoformat()}
+            update_data = {"updated_at": _now()}
             
             if title is not None:
                 update_data["title"] = title
@@ -161,14 +459,14 @@ class WeaviateManager:
             if tags is not None:
                 update_data["tags"] = tags
             
-            def _update():
-                return self.client.data_object.update(
+            def _update(client):
+                return client.data_object.update(
                     data_object=update_data,
                     class_name="KnowledgeBase",
                     uuid=object_id
                 )
             
-            await asyncio.to_thread(_update)
+            await self._run("write", _update)
             logger.info(f"Updated knowledge: {object_id}")
             return True
             
@@ -177,28 +475,217 @@ class WeaviateManager:
             return False
     
     async def delete_knowledge(self, object_id: str) -> bool:
-        """Delete knowledge by ID"""
+        """Delete knowledge by ID.
+        
+        The tombstone for the change feed is written first, so a delete never
+        lands without one. Returns False if either step fails.
+        """
         try:
-            def _delete():
-                return self.client.data_object.delete(
+            def _tombstone(client):
+                # Batch imports upsert, so a retried delete just refreshes the tombstone
+                client.batch.add_data_object(
+                    data_object={"object_id": object_id, "deleted_at": _now()},
+                    class_name="KnowledgeTombstone",
+                    uuid=object_id
+                )
+                results = client.batch.create_objects()
+                errors = [result["result"]["errors"] for result in results or [] if result.get("result", {}).get("errors")]
+                if errors:
+                    raise RuntimeError(f"Tombstone rejected: {errors[0]}")
+            
+            await self._run("batch", _tombstone)
+        except Exception as e:
+            logger.error(f"Failed to record tombstone for {object_id}, not deleting: {e}")
+            return False
+        
+        try:
+            def _delete(client):
+                return client.data_object.delete(
                     uuid=object_id,
                     class_name="KnowledgeBase"
                 )
             
-            await asyncio.to_thread(_delete)
+            await self._run("write", _delete)
             logger.info(f"Deleted knowledge: {object_id}")
-            return True
             
         except Exception as e:
-            logger.error(f"Failed to delete knowledge: {e}")
+            if getattr(e, "status_code", None) == 404:
+                # Already gone, e.g. a retry of a delete whose response was lost
+                logger.info(f"Knowledge already deleted: {object_id}")
+            else:
+                logger.error(f"Failed to delete knowledge: {e}")
+                await self._drop_tombstone(object_id)
+                return False
+        
+        self._schedule_prune()
+        return True
+    
+    async def _drop_tombstone(self, object_id: str):
+        """Best-effort removal of a tombstone whose delete did not happen"""
+        try:
+            def _drop(client):
+                return client.data_object.delete(uuid=object_id, class_name="KnowledgeTombstone")
+            
+            await self._run("write", _drop)
+        except Exception as e:
+            logger.warning(f"Could not remove tombstone for {object_id}: {e}")
+    
+    def _schedule_prune(self):
+        """Prune expired tombstones in the background, at most once per interval"""
+        if time.monotonic() - self.last_prune < self.tombstone_prune_interval:
+            return
+        self.last_prune = time.monotonic()
+        self._prune_task = asyncio.create_task(self.prune_tombstones())
+    
+    async def prune_tombstones(self) -> bool:
+        """Delete tombstones older than the retention window"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.tombstone_retention_days)
+        try:
+            def _prune(client):
+                return client.batch.delete_objects(
+                    class_name="KnowledgeTombstone",
+                    where={
+                        "path": ["deleted_at"],
+                        "operator": "LessThan",
+                        "valueDate": cutoff.isoformat()
+                    }
+                )
+            
+            result = await self._run("batch", _prune)
+            logger.info(f"Pruned tombstones older than {cutoff.isoformat()}: {(result or {}).get('results', {}).get('successful', 0)}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to prune tombstones: {e}")
             return False
     
+    async def get_changes(self, since: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """List entries updated or deleted since a point in time, oldest first.
+        
+        Pass ``since`` (ISO timestamp) to start a sync and the returned ``cursor``
+        to continue it. Raises ValueError for a malformed ``since`` or ``cursor``.
+        
+        Timestamps come from this process's clock when a write is sent, so a
+        write can land up to its deadline later. Only entries older than
+        ``CHANGES_SAFETY_LAG`` seconds are returned, and a caught-up cursor
+        moves to that horizon even when nothing changed.
+        
+        Tombstones are kept for ``TOMBSTONE_RETENTION_DAYS``; a sync resumed from
+        further back could miss deletes, so it raises ChangesExpiredError and the
+        client has to start over with a full sync (no ``since``).
+        """
+        if cursor:
+            try:
+                position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+                start = _parse_date(position["t"])
+                seen = set(position["ids"])
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid cursor: {e}")
+        else:
+            start = _parse_date(since) if since else datetime.fromtimestamp(0, timezone.utc)
+            seen = set()
+        
+        if (cursor or since) and start < datetime.now(timezone.utc) - timedelta(days=self.tombstone_retention_days):
+            raise ChangesExpiredError(
+                f"Changes are only kept for {self.tombstone_retention_days:g} days; start a full sync"
+            )
+        
+        # Entries sharing the cursor timestamp that were already returned are
+        # filtered out below, so over-fetch by that many
+        fetch_limit = limit + len(seen) + 1
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=self.changes_safety_lag)
+        
+        def _window(path):
+            return {
+                "operator": "And",
+                "operands": [
+                    {"path": [path], "operator": "GreaterThanEqual", "valueDate": start.isoformat()},
+                    {"path": [path], "operator": "LessThan", "valueDate": horizon.isoformat()}
+                ]
+            }
+        
+        try:
+            def _changes(client):
+                updated = (
+                    client.query
+                    .get("KnowledgeBase", ["title", "content", "category", "created_at", "updated_at", "tags"])
+                    .with_where(_window("updated_at"))
+                    .with_sort({"path": ["updated_at"], "order": "asc"})
+                    .with_limit(fetch_limit)
+                    .with_additional(["id"])
+                    .do()
+                )
+                deleted = (
+                    client.query
+                    .get("KnowledgeTombstone", ["object_id", "deleted_at"])
+                    .with_where(_window("deleted_at"))
+                    .with_sort({"path": ["deleted_at"], "order": "asc"})
+                    .with_limit(fetch_limit)
+                    .do()
+                )
+                return updated, deleted
+            
+            updated, deleted = await self._run("read", _changes, idempotent=True)
+            updated_items = updated.get('data', {}).get('Get', {}).get('KnowledgeBase', [])
+            deleted_items = deleted.get('data', {}).get('Get', {}).get('KnowledgeTombstone', [])
+            
+            changes = [
+                {
+                    "id": item["_additional"]["id"],
+                    "change": "upsert",
+                    "timestamp": item["updated_at"],
+                    "object": {key: value for key, value in item.items() if key != "_additional"}
+                }
+                for item in updated_items
+            ] + [
+                {
+                    "id": item["object_id"],
+                    "change": "delete",
+                    "timestamp": item["deleted_at"],
+                    "object": None
+                }
+                for item in deleted_items
+            ]
+            changes.sort(key=lambda change: (_parse_date(change["timestamp"]), change["id"]))
+            changes = [
+                change for change in changes
+                if not (change["id"] in seen and _parse_date(change["timestamp"]) == start)
+            ]
+            
+            page = changes[:limit]
+            has_more = len(changes) > limit or fetch_limit in (len(updated_items), len(deleted_items))
+            
+            if has_more:
+                last = _parse_date(page[-1]["timestamp"])
+                ids = [change["id"] for change in page if _parse_date(change["timestamp"]) == last]
+                if last == start:
+                    ids += list(seen)
+            elif horizon > start:
+                # Everything before the horizon has been returned
+                last, ids = horizon, []
+            else:
+                last, ids = start, list(seen)
+            
+            next_cursor = base64.urlsafe_b64encode(json.dumps({"t": last.isoformat(), "ids": ids}).encode()).decode()
+            
+            return {
+                "changes": page,
+                "cursor": next_cursor,
+                "has_more": has_more,
+                "checked_through": last.isoformat(),
+                "count": len(page)
+            }
+            
+        except Exception as e:
+            logger.error(f"Changes error: {e!r}")
+            return {"error": str(e)}
+    
     async def list_all(self, limit: int = 20, category: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all knowledge entries"""
+        cache_key = ("list", limit, category)
         try:
-            def _list():
+            def _list(client):
                 query_builder = (
-                    self.client.query
+                    client.query
                     .get("KnowledgeBase", ["title", "content", "category", "created_at", "tags"])
                     .with_limit(limit)
                     .with_additional(["id"])
@@ -213,44 +700,78 @@ class WeaviateManager:
                 
                 return query_builder.do()
             
-            result = await asyncio.to_thread(_list)
+            result = await self._run("read", _list, idempotent=True)
             items = result.get('data', {}).get('Get', {}).get('KnowledgeBase', [])
+            self._remember(cache_key, items)
             return items
             
         except Exception as e:
-            logger.error(f"List error: {e}")
+            stale = self._stale(cache_key, e)
+            if stale is not None:
+                return stale
+            logger.error(f"List error: {e!r}")
             return []
     
+    async def export_objects(self, batch_size: int = 500) -> List[Dict[str, Any]]:
+        """Export every entry with its vector, paging with the cursor API"""
+        objects = []
+        after = None
+        
+        while True:
+            def _page(client):
+                query_builder = (
+                    client.query
+                    .get("KnowledgeBase", ["title", "content", "category", "created_at", "updated_at", "tags"])
+                    .with_limit(batch_size)
+                    .with_additional(["id", "vector"])
+                )
+                if after:
+                    query_builder = query_builder.with_after(after)
+                return query_builder.do()
+            
+            result = await self._run("read", _page, idempotent=True)
+            items = result.get('data', {}).get('Get', {}).get('KnowledgeBase', [])
+            if not items:
+                return objects
+            
+            objects.extend(items)
+            after = items[-1]['_additional']['id']
+    
     async def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            def _get_stats():
+            def _get_stats(client):
                 # Get total count
-                result = self.client.query.aggregate("KnowledgeBase").with_meta_count().do()
+                result = client.query.aggregate("KnowledgeBase").with_meta_count().do()
                 total_count = result.get('data', {}).get('Aggregate', {}).get('KnowledgeBase', [{}])[0].get('meta', {}).get('count', 0)
                 
                 # Get categories
-                category_result = self.client.query.aggregate("KnowledgeBase").with_group_by_filter(["category"]).do()
+                category_result = client.query.aggregate("KnowledgeBase").with_group_by_filter(["category"]).do()
                 
                 return {
                     "total_entries": total_count,
-                    "schema_classes": len(self.client.schema.get().get("classes", [])),
-                    "timestamp": datetime.now().isoformat()
+                    "schema_classes": len(client.schema.get().get("classes", [])),
+                    "timestamp": _now()
                 }
             
-            return await asyncio.to_thread(_get_stats)
+            stats = await self._run("read", _get_stats, idempotent=True)
+            self._remember(("stats",), stats)
+            return stats
             
         except Exception as e:
-            logger.error(f"Stats error: {e}")
+            stale = self._stale(("stats",), e)
+            if stale is not None:
+                return {**stale, "stale": True}
+            logger.error(f"Stats error: {e!r}")
             return {"error": str(e)}
     
     async def get_schema(self) -> Dict[str, Any]:
         """Get current schema"""
         try:
-            def _get_schema():
-                return self.client.schema.get()
+            def _get_schema(client):
+                return client.schema.get()
             
-            return await asyncio.to_thread(_get_schema)
+            return await self._run("admin", _get_schema)
             
         except Exception as e:
             logger.error(f"Schema error: {e}")
@@ -258,10 +779,11 @@ class WeaviateManager:
     
     async def browse_data(self, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
         """Browse database contents with pagination"""
+        cache_key = ("browse", limit, offset)
         try:
-            def _browse():
+            def _browse(client):
                 return (
-                    self.client.query
+                    client.query
                     .get("KnowledgeBase", ["title", "content", "category", "created_at", "tags"])
                     .with_limit(limit)
                     .with_offset(offset)
@@ -269,28 +791,37 @@ class WeaviateManager:
                     .do()
                 )
             
-            result = await asyncio.to_thread(_browse)
+            result = await self._run("read", _browse, idempotent=True)
             items = result.get('data', {}).get('Get', {}).get('KnowledgeBase', [])
             
-            return {
+            data = {
                 "items": items,
                 "limit": limit,
                 "offset": offset,
                 "count": len(items)
             }
+            self._remember(cache_key, data)
+            return data
             
         except Exception as e:
-            logger.error(f"Browse error: {e}")
+            stale = self._stale(cache_key, e)
+            if stale is not None:
+                return {**stale, "stale": True}
+            logger.error(f"Browse error: {e!r}")
             return {"error": str(e)}
     
     async def health_check(self) -> str:
         """Check Weaviate health"""
+        if not self.available:
+            return "circuit_open"
         try:
-            await asyncio.to_thread(self.client.schema.get)
+            await self._run("admin", lambda client: client.schema.get())
             return "connected"
-        except:
+        except Exception:
             return "disconnected"
     
     async def close(self):
         """Close Weaviate client"""
-        pass
+        self.read_executor.shutdown(wait=False, cancel_futures=True)
+        self.write_executor.shutdown(wait=False, cancel_futures=True)
+        self.batch_executor.shutdown(wait=False, cancel_futures=True)
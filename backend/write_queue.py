@@ -0,0 +1,382 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from storage_backend import StorageBackend, track_read_failures
+
+logger = logging.getLogger(__name__)
+
+class WriteQueue:
+    """Write-behind queue for knowledge base mutations.
+
+    Mutations are appended to a local JSONL journal and acknowledged with an
+    operation ID straight away. A single worker drains the queue, coalescing
+    everything submitted within ``batch_interval`` into one batch: adds go out
+    as a single batch import, repeated updates of the same object are merged,
+    and updates of objects deleted in the same batch are dropped. Failed
+    operations are retried with exponential backoff and only leave the journal
+    once applied or out of attempts. While an operation is waiting to retry,
+    later operations on the same object are held back, so a retried update can
+    never overwrite a newer one. Operations still in the journal at startup
+    are replayed.
+
+    Updates and deletes may be submitted with a search ``query`` instead of an
+    ``object_id``; the worker resolves the target with the registered resolver,
+    so submitting them doesn't wait on a search. The resolved id is journaled
+    so a replay acts on the same entry.
+    """
+
+    def __init__(self, weaviate_manager: StorageBackend):
+        self.weaviate = weaviate_manager
+        self.enabled = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+        self.journal_path = os.getenv("WRITE_JOURNAL_PATH", "data/write_journal.jsonl")
+        self.batch_size = int(os.getenv("WRITE_BATCH_SIZE", "100"))
+        self.batch_interval = float(os.getenv("WRITE_BATCH_INTERVAL", "0.2"))
+        self.status_history = int(os.getenv("WRITE_STATUS_HISTORY", "10000"))
+        self.max_attempts = int(os.getenv("WRITE_MAX_ATTEMPTS", "5"))
+        self.retry_backoff = float(os.getenv("WRITE_RETRY_BACKOFF", "1"))
+        self.queue = None
+        self.operations = OrderedDict()
+        # op_id -> object id of operations waiting to be retried
+        self.retrying: Dict[str, Optional[str]] = {}
+        # object id -> later operations held back until its retries finish
+        self.held: Dict[str, List[Dict[str, Any]]] = {}
+        self.released: List[Dict[str, Any]] = []
+        self.applying = False
+        self.listeners: List[Callable[[], Awaitable[None]]] = []
+        self.resolver: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None
+        self._worker = None
+        self._journal_lock = asyncio.Lock()
+
+    async def start(self):
+        """Replay the journal and start the background worker"""
+        if not self.enabled:
+            return
+        if self.weaviate.read_only:
+            logger.warning("Write-behind disabled: storage backend is read-only")
+            self.enabled = False
+            return
+
+        self.queue = asyncio.Queue()
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        for operation in await asyncio.to_thread(self._read_pending):
+            self._track(operation)
+            self.queue.put_nowait(operation)
+
+        if not self.queue.empty():
+            logger.info(f"Replaying {self.queue.qsize()} queued write(s) from journal")
+
+        self._worker = asyncio.create_task(self._run())
+        logger.info("Write-behind queue started")
+
+    async def stop(self):
+        """Stop the worker; unapplied operations stay in the journal"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def add_listener(self, callback: Callable[[], Awaitable[None]]):
+        """Register a coroutine to call after each applied batch"""
+        self.listeners.append(callback)
+
+    def set_resolver(self, resolver: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]):
+        """Register the coroutine mapping a search query to the entry it targets"""
+        self.resolver = resolver
+
+    async def submit(self, op_type: str, **payload) -> str:
+        """Queue an ``add``, ``update`` or ``delete`` and return its operation ID"""
+        operation = {
+            "op_id": uuid.uuid4().hex,
+            "type": op_type,
+            "payload": payload,
+            "submitted_at": time.time()
+        }
+        if op_type == "add":
+            # Fixed up front so a replayed add upserts instead of duplicating
+            operation["payload"]["id"] = str(uuid.uuid4())
+
+        async with self._journal_lock:
+            await asyncio.to_thread(self._write_journal, [operation])
+            self._track(operation)
+            self.queue.put_nowait(operation)
+        return operation["op_id"]
+
+    def get_status(self, op_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status record of an operation, if still known"""
+        return self.operations.get(op_id)
+
+    def _track(self, operation: Dict[str, Any]):
+        self.operations[operation["op_id"]] = {
+            "operation_id": operation["op_id"],
+            "type": operation["type"],
+            "status": "pending",
+            "submitted_at": operation["submitted_at"],
+            "object_id": operation["payload"].get("id") or operation["payload"].get("object_id"),
+            "query": operation["payload"].get("query"),
+            "attempts": 0
+        }
+        self._evict()
+
+    def _evict(self):
+        """Forget the oldest completed operations; pending ones are always kept"""
+        excess = len(self.operations) - self.status_history
+        if excess <= 0:
+            return
+        completed = [
+            op_id for op_id, status in self.operations.items()
+            if status["status"] in ("applied", "failed")
+        ]
+        for op_id in completed[:excess]:
+            del self.operations[op_id]
+
+    async def _run(self):
+        while True:
+            batch = self._take_released() or [await self.queue.get()]
+            deadline = time.monotonic() + self.batch_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Journal compaction waits while a batch is in flight
+            self.applying = True
+            try:
+                batch = self._hold_back(batch)
+                if any(self._unresolved(operation) for operation in batch):
+                    # Resolved targets may be held by a retry, so check again
+                    batch = self._hold_back(await self._resolve(batch))
+                if not batch:
+                    continue
+
+                # Hold the batch while Weaviate's circuit is open rather than failing it
+                while not self.weaviate.writable:
+                    await asyncio.sleep(1)
+
+                error = None
+                try:
+                    results = await self._apply(batch)
+                except Exception as e:
+                    logger.error(f"Write batch failed: {e}")
+                    results, error = {}, str(e)
+            finally:
+                self.applying = False
+            await self._finish(batch, results, error)
+
+    async def _apply(self, batch: List[Dict[str, Any]]) -> Dict[str, bool]:
+        adds = [operation for operation in batch if operation["type"] == "add"]
+        deletes = {}
+        updates = {}
+
+        for operation in batch:
+            payload = operation["payload"]
+            if operation["type"] == "delete":
+                deletes.setdefault(payload["object_id"], []).append(operation["op_id"])
+            elif operation["type"] == "update":
+                merged = updates.setdefault(payload["object_id"], {"fields": {}, "op_ids": []})
+                merged["fields"].update({
+                    key: value for key, value in payload.items() if key not in ("object_id", "query")
+                })
+                merged["op_ids"].append(operation["op_id"])
+
+        results = {}
+
+        if adds:
+            flags = await self.weaviate.add_knowledge_batch([operation["payload"] for operation in adds])
+            results.update({operation["op_id"]: ok for operation, ok in zip(adds, flags)})
+
+        for object_id, merged in updates.items():
+            if object_id in deletes:
+                # Superseded by a delete in the same batch
+                deletes[object_id].extend(merged["op_ids"])
+                continue
+            ok = await self.weaviate.update_knowledge(object_id, **merged["fields"])
+            results.update({op_id: ok for op_id in merged["op_ids"]})
+
+        for object_id, op_ids in deletes.items():
+            ok = await self.weaviate.delete_knowledge(object_id)
+            results.update({op_id: ok for op_id in op_ids})
+
+        logger.info(f"Applied write batch of {len(batch)} operation(s)")
+        return results
+
+    async def _resolve(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Look up the targets of query-based operations; returns those ready to apply"""
+        ready = []
+        for operation in batch:
+            if not self._unresolved(operation):
+                ready.append(operation)
+                continue
+
+            query = operation["payload"]["query"]
+            item = None
+            failed = self.resolver is None
+            if self.resolver is not None:
+                try:
+                    with track_read_failures() as read_failed:
+                        item = await self.resolver(query)
+                        failed = read_failed()
+                except Exception as e:
+                    logger.error(f"Resolving '{query}' failed: {e}")
+                    failed = True
+
+            if item is not None:
+                object_id = item["_additional"]["id"]
+                operation["payload"]["object_id"] = object_id
+                status = self.operations.get(operation["op_id"], {})
+                status["object_id"] = object_id
+                status["title"] = item.get("title")
+                await self._append_journal([{"op_id": operation["op_id"], "resolved": object_id}])
+                ready.append(operation)
+            elif failed:
+                await self._finish([operation], {}, f"Could not look up '{query}'")
+            else:
+                await self._finish([operation], {}, f"No items found matching '{query}'", retry=False)
+        return ready
+
+    async def _finish(self, batch: List[Dict[str, Any]], results: Dict[str, bool], error: Optional[str] = None,
+                      retry: bool = True):
+        now = time.time()
+        completed = {}
+
+        for operation in batch:
+            op_id = operation["op_id"]
+            ok = results.get(op_id, False)
+            operation["attempts"] = operation.get("attempts", 0) + 1
+            status = self.operations.get(op_id, {})
+            status["attempts"] = operation["attempts"]
+
+            if ok or not retry or operation["attempts"] >= self.max_attempts:
+                completed[op_id] = ok
+                self.retrying.pop(op_id, None)
+                status["status"] = "applied" if ok else "failed"
+                status["completed_at"] = now
+            else:
+                # Still in the journal; requeue after backoff
+                status["status"] = "retrying"
+                delay = min(self.retry_backoff * 2 ** (operation["attempts"] - 1), 60)
+                key = self._target_key(operation)
+                self.retrying[op_id] = key
+                if key is not None:
+                    self.held.setdefault(key, [])
+                asyncio.get_running_loop().call_later(delay, self._requeue, operation)
+
+            if ok:
+                status.pop("error", None)
+            else:
+                status["error"] = error or "Weaviate write failed"
+
+        self._release_held()
+        if completed:
+            await self._append_journal([{"op_id": op_id, "done": True} for op_id in completed])
+        if self._idle():
+            await self._compact_journal()
+        self._evict()
+
+        if any(completed.values()):
+            for callback in self.listeners:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.warning(f"Write listener failed: {e}")
+
+    def _requeue(self, operation: Dict[str, Any]):
+        # Stays in ``retrying`` until it completes, keeping its object held
+        self.queue.put_nowait(operation)
+
+    @staticmethod
+    def _unresolved(operation: Dict[str, Any]) -> bool:
+        payload = operation["payload"]
+        return "query" in payload and not payload.get("object_id")
+
+    @staticmethod
+    def _target_key(operation: Dict[str, Any]) -> Optional[str]:
+        """The object an operation acts on, or its query while that is unresolved"""
+        payload = operation["payload"]
+        if payload.get("object_id") or payload.get("id"):
+            return payload.get("object_id") or payload.get("id")
+        if payload.get("query"):
+            return f"query:{payload['query'].lower()}"
+        return None
+
+    def _hold_back(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Set aside new operations on objects that have a retry outstanding"""
+        ready = []
+        for operation in batch:
+            key = self._target_key(operation)
+            if operation["op_id"] not in self.retrying and key in self.held:
+                self.held[key].append(operation)
+            else:
+                ready.append(operation)
+        return ready
+
+    def _release_held(self):
+        """Release held operations of objects whose retries have all finished"""
+        waiting = set(self.retrying.values())
+        for key in [key for key in self.held if key not in waiting]:
+            self.released.extend(self.held.pop(key))
+
+    def _take_released(self) -> List[Dict[str, Any]]:
+        # Released operations are older than anything still queued, so they go first
+        released, self.released = self.released, []
+        return released
+
+    def _idle(self) -> bool:
+        return (self.queue.empty() and not self.retrying and not self.held and not self.released
+                and not self.applying)
+
+    def _write_journal(self, records: List[Dict[str, Any]]):
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            for record in records:
+                journal.write(json.dumps(record) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    async def _append_journal(self, records: List[Dict[str, Any]]):
+        async with self._journal_lock:
+            await asyncio.to_thread(self._write_journal, records)
+
+    async def _compact_journal(self):
+        def _truncate():
+            open(self.journal_path, "w").close()
+
+        async with self._journal_lock:
+            # Re-check under the lock: a submit may have raced the compaction
+            if self._idle():
+                await asyncio.to_thread(_truncate)
+
+    def _read_pending(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+
+        pending = OrderedDict()
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                if record.get("done"):
+                    pending.pop(record["op_id"], None)
+                elif "resolved" in record:
+                    if record["op_id"] in pending:
+                        pending[record["op_id"]]["payload"]["object_id"] = record["resolved"]
+                else:
+                    pending[record["op_id"]] = record
+        return list(pending.values())
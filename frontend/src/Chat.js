@@ -1,6 +1,19 @@
 import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 
+// One random ID per browser, kept across reloads, so the backend can tell
+// visitors apart (rate limits are per session)
+const getSessionId = () => {
+  let sessionId = localStorage.getItem('sessionId');
+  if (!sessionId) {
+    sessionId = window.crypto?.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+    localStorage.setItem('sessionId', sessionId);
+  }
+  return sessionId;
+};
+
 const Chat = () => {
   const [messages, setMessages] = useState([]);
   const [inputMessage, setInputMessage] = useState('');
@@ -70,7 +83,7 @@ Try asking me about "smart city infrastructure" or "HDMI connectivity"!`,
     try {
       const response = await axios.post('/api/chat', {
         message: inputMessage,
-        session_id: 'default'
+        session_id: getSessionId()
       });
 
       const botMessage = {
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Export the knowledge base from Weaviate into a local index snapshot
+
+Run this wherever Weaviate is reachable and copy the resulting directory to
+nodes running with STORAGE_BACKEND=local, or point LOCAL_INDEX_PATH at the
+directory they serve from; they pick up new snapshots on their own.
+
+Uses WEAVIATE_URL, WEAVIATE_API_KEY and LOCAL_INDEX_PATH like the backend.
+"""
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from local_index import LocalIndex
+from weaviate_manager import WeaviateManager
+
+async def sync(path):
+    weaviate_manager = WeaviateManager()
+    local_index = LocalIndex(path)
+    try:
+        await weaviate_manager.initialize()
+        if not await local_index.sync_from(weaviate_manager):
+            return False
+        stats = await local_index.get_database_stats()
+        print(f"✅ Wrote snapshot with {stats['total_entries']} entries to {local_index.path}")
+        return True
+    except Exception as e:
+        print(f"❌ Sync failed: {e}")
+        return False
+    finally:
+        await weaviate_manager.close()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    if not asyncio.run(sync(path)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()